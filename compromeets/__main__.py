@@ -1,6 +1,6 @@
-def main():
-    print("Hello from compromeets!")
+import sys
 
+from compromeets.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
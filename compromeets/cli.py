@@ -0,0 +1,253 @@
+"""
+Command line entry point.
+
+    compromeets suggest "SW1A 1AA" "M1 1AE" --kind pub cafe --zoom 12
+    compromeets suggest "SW1A 1AA" "E1 6AN" --mode BICYCLE
+    compromeets map <request_id> --zoom 14
+    compromeets ingest --workers 4
+    compromeets build-cache
+    compromeets bench "SW1A 1AA" "M1 1AE" --repeat 5
+    compromeets daemon
+
+Only the standard library is imported up front; numpy, shapely, pandas and r5py are imported
+inside the handler that needs them. ``suggest`` and ``bench`` go through a running daemon when
+one is listening on the socket, so a query skips loading the network and starting the JVM.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from compromeets import daemon
+from compromeets.config import ARTIFACTS_DIR, DAEMON_SOCKET, ONSPD_CSV
+from compromeets.models.constants import DEFAULT_TRANSPORT_MODES, TRANSPORT_MODES, VENUE_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Bad input from the user rather than a bug: unknown postcodes (KeyError in-process, RuntimeError
+# from the daemon), failed validation (pydantic's ValidationError is a ValueError), unreachable
+# groups (ValueError) and missing artifacts
+_QUERY_ERRORS = (KeyError, ValueError, RuntimeError, FileNotFoundError)
+
+
+def _report(error: Exception) -> int:
+    message = error.args[0] if isinstance(error, KeyError) and error.args else error
+    print(f"Error: {message}", file=sys.stderr)
+    return 1
+
+
+def _suggest_params(args: argparse.Namespace) -> dict:
+    departure = args.departure or datetime.datetime.now().replace(second=0, microsecond=0)
+    return {
+        "postcodes": args.postcodes,
+        "departure": departure.isoformat(),
+        "venue_kinds": args.kind,
+        "transport_modes": args.mode,
+        "budget_ratio": args.budget_ratio,
+        "zoom": args.zoom,
+    }
+
+
+def _run_suggest(args: argparse.Namespace, params: dict) -> dict:
+    if not args.no_daemon and daemon.is_running(args.socket):
+        return daemon.request(args.socket, "suggest", params)
+
+    from compromeets.models.inputs import SuggestRequest
+    from compromeets.services.suggest_service import SuggestService
+
+    logger.info("No daemon on %s, loading the transport network in-process", args.socket)
+    with SuggestService.from_artifacts(args.artifacts_dir, args.onspd_csv) as service:
+        return service.suggest(SuggestRequest.model_validate(params)).model_dump(mode="json")
+
+
+def cmd_suggest(args: argparse.Namespace) -> int:
+    try:
+        response = _run_suggest(args, _suggest_params(args))
+    except _QUERY_ERRORS as e:
+        return _report(e)
+    print(json.dumps(response, indent=2))
+    return 0
+
+
+def cmd_map(args: argparse.Namespace) -> int:
+    # Request ids live in the daemon's cache, so there is nothing to fall back to in-process
+    if not daemon.is_running(args.socket):
+        print(f"No daemon listening on {args.socket}")
+        return 1
+    try:
+        topology = daemon.request(args.socket, "map", {"request_id": args.request_id, "zoom": args.zoom})
+    except RuntimeError as e:
+        return _report(e)
+    print(json.dumps(topology, separators=(",", ":")))
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    try:
+        return _bench(args)
+    except _QUERY_ERRORS as e:
+        return _report(e)
+
+
+def _bench(args: argparse.Namespace) -> int:
+    params = _suggest_params(args)
+    if args.no_daemon or not daemon.is_running(args.socket):
+        from compromeets.models.inputs import SuggestRequest
+        from compromeets.services.suggest_service import SuggestService
+
+        start = time.perf_counter()
+        service = SuggestService.from_artifacts(args.artifacts_dir, args.onspd_csv)
+        print(f"{'startup':>10}  {time.perf_counter() - start:8.3f}s")
+        request = SuggestRequest.model_validate(params)
+
+        def run() -> None:
+            service.suggest(request)
+    else:
+        service = None
+        print(f"{'startup':>10}  {'(daemon)':>9}")
+
+        def run() -> None:
+            daemon.request(args.socket, "suggest", params)
+
+    timings = []
+    try:
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+            print(f"{f'query {i + 1}':>10}  {timings[-1]:8.3f}s")
+    finally:
+        if service is not None:
+            service.close()
+
+    timings.sort()
+    print(f"{'median':>10}  {timings[len(timings) // 2]:8.3f}s")
+    return 0
+
+
+def cmd_ingest(args: argparse.Namespace) -> int:
+    from compromeets.data.pipeline import PipelineRunner, StageStatus
+    from compromeets.data.stages import build_ingest_stages
+
+    stages = build_ingest_stages(args.artifacts_dir)
+    if not stages:
+        print(f"No ingestion inputs found under {args.artifacts_dir}")
+        return 1
+
+    runner = PipelineRunner(stages, args.artifacts_dir / ".pipeline" / "manifest.json", max_workers=args.workers)
+    statuses = runner.run(force=args.force)
+
+    print()
+    for name, status in sorted(statuses.items()):
+        print(f"  {status.value:>8}  {name}")
+
+    return 1 if any(status in (StageStatus.FAILED, StageStatus.BLOCKED) for status in statuses.values()) else 0
+
+
+def cmd_build_cache(args: argparse.Namespace) -> int:
+    from compromeets.data.stages import existing_gtfs_feeds, latest_osm_extract
+    from compromeets.services.transport_network_provider import get_transport_network
+
+    osm_pbf = args.osm or latest_osm_extract(args.artifacts_dir)
+    if osm_pbf is None:
+        print(f"No .osm.pbf extract found in {args.artifacts_dir}")
+        return 1
+    gtfs = args.gtfs if args.gtfs is not None else existing_gtfs_feeds(args.artifacts_dir)
+
+    # r5py caches the built network next to the OSM extract, so later loads skip the build
+    start = time.perf_counter()
+    get_transport_network(osm_pbf, gtfs)
+    print(f"Built network from {osm_pbf.name} and {len(gtfs)} GTFS feeds in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    # Check before loading, which takes long enough that finding out afterwards wastes it
+    if daemon.is_running(args.socket):
+        print(f"A daemon is already listening on {args.socket}")
+        return 1
+
+    from compromeets.services.suggest_service import SuggestService
+
+    start = time.perf_counter()
+    service = SuggestService.from_artifacts(args.artifacts_dir, args.onspd_csv)
+    logger.info("Loaded in %.1fs, listening on %s", time.perf_counter() - start, args.socket)
+    with service, daemon.DaemonServer(args.socket, service) as server, contextlib.suppress(KeyboardInterrupt):
+        server.serve_forever()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="compromeets", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log at DEBUG level")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    paths = argparse.ArgumentParser(add_help=False)
+    paths.add_argument("--artifacts-dir", type=Path, default=ARTIFACTS_DIR)
+
+    service = argparse.ArgumentParser(add_help=False, parents=[paths])
+    service.add_argument("--onspd-csv", type=Path, default=ONSPD_CSV)
+    service.add_argument("--socket", type=Path, default=DAEMON_SOCKET, help="Daemon socket path")
+
+    query = argparse.ArgumentParser(add_help=False, parents=[service])
+    query.add_argument("postcodes", nargs="+", help="One postcode per person")
+    query.add_argument("--departure", type=datetime.datetime.fromisoformat, help="ISO datetime; defaults to now")
+    query.add_argument("--kind", nargs="+", choices=VENUE_KINDS, default=["pub"], help="Venue kinds to search for")
+    query.add_argument(
+        "--mode",
+        nargs="+",
+        choices=TRANSPORT_MODES,
+        default=list(DEFAULT_TRANSPORT_MODES),
+        help="Transport modes everyone travels by",
+    )
+    query.add_argument("--budget-ratio", type=float, default=0.7, help="Fraction of the longest trip to allow")
+    query.add_argument("--no-daemon", action="store_true", help="Always run in-process")
+    query.add_argument("--zoom", type=int, help="Return geometries as TopoJSON simplified for this map zoom")
+
+    sub = subparsers.add_parser("suggest", parents=[query], help="Suggest venues for a group of postcodes")
+    sub.set_defaults(handler=cmd_suggest)
+
+    sub = subparsers.add_parser("map", parents=[service], help="Fetch a suggestion's map from the daemon")
+    sub.add_argument("request_id", help="request_id from a suggest response")
+    sub.add_argument("--zoom", type=int, required=True)
+    sub.set_defaults(handler=cmd_map)
+
+    sub = subparsers.add_parser("bench", parents=[query], help="Time repeated suggest queries")
+    sub.add_argument("--repeat", type=int, default=5)
+    sub.set_defaults(handler=cmd_bench)
+
+    sub = subparsers.add_parser("ingest", parents=[paths], help="Run out-of-date ingestion stages")
+    sub.add_argument("--workers", type=int, default=4, help="Maximum stages to run at once")
+    sub.add_argument("--force", nargs="*", default=[], help="Stage names to rerun regardless of inputs")
+    sub.set_defaults(handler=cmd_ingest)
+
+    sub = subparsers.add_parser("build-cache", parents=[paths], help="Build r5py's transport network cache")
+    sub.add_argument("--osm", type=Path, help="OSM extract; defaults to the newest in the artifacts directory")
+    sub.add_argument("--gtfs", type=Path, nargs="*", help="GTFS feeds; defaults to all in the artifacts directory")
+    sub.set_defaults(handler=cmd_build_cache)
+
+    sub = subparsers.add_parser("daemon", parents=[service], help="Keep the network warm and serve queries")
+    sub.set_defaults(handler=cmd_daemon)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Parse ``argv`` and run the chosen command, returning its exit code."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
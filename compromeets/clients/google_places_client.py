@@ -25,7 +25,15 @@ class GooglePlacesClient:
         radius: float,
         types: list[str],
         max_result_count: int = 10,
+        rank_preference: str | None = None,
     ) -> dict:
+        body = {
+            "includedTypes": types,
+            "maxResultCount": max_result_count,
+            "locationRestriction": {"circle": {"center": location, "radius": int(radius)}},
+        }
+        if rank_preference is not None:
+            body["rankPreference"] = rank_preference  # "POPULARITY" (Google's default) or "DISTANCE"
         response = self.client.post(
             self.base_url,
             headers={
@@ -33,11 +41,7 @@ class GooglePlacesClient:
                 "X-Goog-FieldMask": "places.displayName,places.rating,places.userRatingCount,places.location",
                 "Content-Type": "application/json",
             },
-            json={
-                "includedTypes": types,
-                "maxResultCount": max_result_count,
-                "locationRestriction": {"circle": {"center": location, "radius": int(radius)}},
-            },
+            json=body,
         )
         response.raise_for_status()
         return response.json()
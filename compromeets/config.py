@@ -0,0 +1,15 @@
+import os
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Root for downloaded data and everything derived from it
+ARTIFACTS_DIR = Path(os.getenv("COMPROMEETS_ARTIFACTS_DIR", PROJECT_ROOT / "compromeets" / "artifacts"))
+
+# ONS Postcode Directory CSV (ONSPD_<release>_UK.csv)
+ONSPD_CSV = Path(os.getenv("COMPROMEETS_ONSPD_CSV", ARTIFACTS_DIR / "onspd.csv"))
+
+# Unix socket the daemon listens on, in the per-user runtime directory rather than shared /tmp
+RUNTIME_DIR = Path(os.getenv("XDG_RUNTIME_DIR") or Path(tempfile.gettempdir()) / f"compromeets-{os.getuid()}")
+DAEMON_SOCKET = Path(os.getenv("COMPROMEETS_SOCKET", RUNTIME_DIR / "compromeets.sock"))
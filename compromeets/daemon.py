@@ -0,0 +1,125 @@
+"""
+Local daemon that keeps the transport network and indexes warm behind a Unix socket.
+
+The protocol is one JSON object per line in each direction:
+
+    -> {"command": "suggest", "params": {...SuggestRequest fields...}}
+    <- {"ok": true, "result": {...SuggestResponse...}}
+    <- {"ok": false, "error": "KeyError: 'Unknown postcode: ZZ9 9ZZ'"}
+    -> {"command": "map", "params": {"request_id": "...", "zoom": 13}}
+    <- {"ok": true, "result": {...TopoJSON...}}
+
+Only the standard library is imported at module level, so the client side adds nothing to
+CLI start-up time.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_BUFFER_SIZE = 1 << 16
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+                response = {"ok": True, "result": self.server.dispatch(message["command"], message.get("params", {}))}
+            except Exception as e:
+                logger.exception("Daemon request failed")
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded Unix socket server in front of a ``SuggestService``.
+
+    Each connection gets its own thread, so concurrent queries reach the service's routing
+    worker together and are batched into shared r5py calls.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path | str, service: Any):
+        self.socket_path = Path(socket_path)
+        self.service = service
+        _make_socket_dir(self.socket_path.parent)
+        if self.socket_path.exists():
+            if is_running(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()  # stale socket from a daemon that didn't shut down cleanly
+        super().__init__(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o600)
+
+    def dispatch(self, command: str, params: dict) -> Any:
+        if command == "ping":
+            return "pong"
+        if command == "suggest":
+            from compromeets.models.inputs import SuggestRequest
+
+            return self.service.suggest(SuggestRequest.model_validate(params)).model_dump(mode="json")
+        if command == "map":
+            return self.service.map(params["request_id"], int(params["zoom"]))
+        raise ValueError(f"Unknown command: {command}")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def request(socket_path: Path | str, command: str, params: dict | None = None, timeout: float | None = None) -> Any:
+    """
+    Send one command to a running daemon and return its result.
+
+    Raises:
+        OSError: If no daemon is listening on ``socket_path``
+        RuntimeError: If the daemon reports an error
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps({"command": command, "params": params or {}}).encode() + b"\n")
+        buffer = b""
+        while not buffer.endswith(b"\n"):
+            chunk = sock.recv(_BUFFER_SIZE)
+            if not chunk:
+                raise RuntimeError("Daemon closed the connection without responding")
+            buffer += chunk
+    response = json.loads(buffer)
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def _make_socket_dir(directory: Path) -> None:
+    """Create the socket's directory as private to this user, refusing one another user controls."""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.stat()
+    if info.st_uid not in (os.getuid(), 0):
+        raise PermissionError(f"Socket directory {directory} is owned by another user (uid {info.st_uid})")
+    # Shared directories like /tmp are only safe with the sticky bit, which stops others replacing our socket
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH) and not info.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"Socket directory {directory} is writable by other users")
+
+
+def is_running(socket_path: Path | str) -> bool:
+    """Whether a daemon answers on ``socket_path``."""
+    try:
+        return request(socket_path, "ping", timeout=1.0) == "pong"
+    except (OSError, RuntimeError):
+        return False
@@ -0,0 +1,69 @@
+"""
+OpenStreetMap extraction of candidate venues.
+
+Reads amenity POIs (pubs, bars, cafes, restaurants) from a Geofabrik ``.osm.pbf`` extract into
+a ``VenueIndex``. Venues mapped as building outlines (ways) are reduced to the mean of their
+node locations.
+
+pyosmium is imported lazily so that loading a saved ``VenueIndex`` doesn't need it.
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from compromeets.data.venue_index import VenueIndex
+from compromeets.models.domain import VENUE_KINDS, Venues
+
+logger = logging.getLogger(__name__)
+
+
+def extract_venues(osm_pbf: Path | str) -> VenueIndex:
+    """
+    Extract venues from an OSM extract.
+
+    Args:
+        osm_pbf: Path to the .osm.pbf file
+
+    Returns:
+        Venue index over every matching node and way
+
+    Raises:
+        ImportError: If pyosmium is not installed
+
+    """
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Venue extraction requires pyosmium, run: uv sync") from e
+
+    kind_codes = {kind: code for code, kind in enumerate(VENUE_KINDS)}
+    coords: list[tuple[float, float]] = []
+    kinds: list[int] = []
+    names: list[str] = []
+    osm_ids: list[int] = []
+
+    class VenueHandler(osmium.SimpleHandler):
+        def _add(self, obj, osm_id: int, lon: float, lat: float) -> None:
+            coords.append((lon, lat))
+            kinds.append(kind_codes[obj.tags["amenity"]])
+            names.append(obj.tags.get("name", ""))
+            osm_ids.append(osm_id)
+
+        def node(self, n):
+            if n.tags.get("amenity") in kind_codes and n.location.valid():
+                self._add(n, n.id, n.location.lon, n.location.lat)
+
+        def way(self, w):
+            if w.tags.get("amenity") not in kind_codes:
+                return
+            locations = [(nd.lon, nd.lat) for nd in w.nodes if nd.location.valid()]
+            if locations:
+                lon, lat = np.mean(locations, axis=0)
+                self._add(w, -w.id, float(lon), float(lat))
+
+    # locations=True caches node positions so way members can be resolved
+    VenueHandler().apply_file(str(osm_pbf), locations=True)
+    logger.info("Extracted %d venues from %s", len(coords), osm_pbf)
+    return VenueIndex(Venues(np.array(coords, dtype=np.float64).reshape(-1, 2), kinds, names, osm_ids))
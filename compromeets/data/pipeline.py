@@ -0,0 +1,274 @@
+"""
+Incremental, content-addressed ingestion pipeline.
+
+Stages declare the files they read and write. The runner orders them into a DAG by matching
+each stage's inputs against other stages' outputs, runs independent stages in parallel, and
+skips any stage whose input hashes match the last successful run recorded in the manifest.
+
+Because a stage's cache key is built from the *content* of its inputs, an upstream stage that
+reruns but produces byte-identical output does not invalidate anything downstream.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 20
+_MANIFEST_VERSION = 1
+
+
+class StageStatus(str, Enum):
+    RAN = "ran"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+    BLOCKED = "blocked"  # an upstream stage failed
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A single pipeline step.
+
+    Args:
+        name: Unique stage name, used as the manifest key
+        run: Callable that produces every path in ``outputs``
+        inputs: Files or directories the stage reads
+        outputs: Files or directories the stage writes
+        version: Bump to force a rerun when the stage's code changes
+
+    """
+
+    name: str
+    run: Callable[[], None]
+    inputs: Sequence[Path | str] = ()
+    outputs: Sequence[Path | str] = ()
+    version: str = "1"
+
+    def __post_init__(self):
+        object.__setattr__(self, "inputs", tuple(Path(p) for p in self.inputs))
+        object.__setattr__(self, "outputs", tuple(Path(p) for p in self.outputs))
+
+
+class FileHasher:
+    """
+    SHA-256 content hashing with a stat-keyed cache.
+
+    Re-hashing multi-GB inputs (OSM extracts, ONSPD) on every run is the slowest part of a
+    no-op refresh, so a file's digest is reused while its size and mtime are unchanged.
+    """
+
+    def __init__(self, cache: dict[str, list] | None = None):
+        self.cache: dict[str, list] = cache or {}
+        self._lock = threading.Lock()
+
+    def hash(self, path: Path | str) -> str:
+        """
+        Hash a file or directory by content.
+
+        Directories are hashed over their sorted relative file paths and file digests, so
+        adding, renaming or editing any file inside changes the result.
+        """
+        path = Path(path)
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for file in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(file.relative_to(path).as_posix().encode())
+                digest.update(b"\0")
+                digest.update(self.hash(file).encode())
+            return digest.hexdigest()
+
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                digest.update(chunk)
+        result = digest.hexdigest()
+        with self._lock:
+            self.cache[key] = [stat.st_size, stat.st_mtime_ns, result]
+        return result
+
+    def snapshot(self) -> dict[str, list]:
+        with self._lock:
+            return dict(self.cache)
+
+
+class PipelineRunner:
+    """Run a set of stages as a DAG, skipping those whose inputs are unchanged."""
+
+    def __init__(self, stages: Iterable[Stage], manifest_path: Path | str, max_workers: int = 4):
+        """
+        Initialize the runner and resolve stage dependencies.
+
+        Args:
+            stages: Stages to run; order does not matter
+            manifest_path: JSON file recording input/output hashes of successful runs
+            max_workers: Maximum number of stages to run at once
+
+        Raises:
+            ValueError: If stage names or outputs collide, or the stages contain a cycle
+
+        """
+        self.stages: dict[str, Stage] = {}
+        producers: dict[Path, str] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+            for output in stage.outputs:
+                key = output.resolve()
+                if key in producers:
+                    raise ValueError(f"{output} is written by both {producers[key]} and {stage.name}")
+                producers[key] = stage.name
+
+        self.dependencies: dict[str, set[str]] = {
+            name: {producers[p.resolve()] for p in stage.inputs if p.resolve() in producers} - {name}
+            for name, stage in self.stages.items()
+        }
+        self._check_acyclic()
+
+        self.manifest_path = Path(manifest_path)
+        self.max_workers = max_workers
+        self._manifest = self._load_manifest()
+        self._hasher = FileHasher(self._manifest["files"])
+        self._manifest_lock = threading.Lock()
+
+    def run(self, force: Iterable[str] = ()) -> dict[str, StageStatus]:
+        """
+        Run every stage that is out of date.
+
+        Args:
+            force: Names of stages to rerun even if their inputs are unchanged
+
+        Returns:
+            Mapping of stage name to the status it finished with
+
+        """
+        force = set(force)
+        unknown = force - self.stages.keys()
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        statuses: dict[str, StageStatus] = {}
+        pending = dict(self.dependencies)
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in self._ready(pending, statuses):
+                    del pending[name]
+                    running[pool.submit(self._execute, self.stages[name], name in force)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        statuses[name] = future.result()
+                    except Exception:
+                        logger.exception("Stage %s failed", name)
+                        statuses[name] = StageStatus.FAILED
+
+        return statuses
+
+    def _ready(self, pending: dict[str, set[str]], statuses: dict[str, StageStatus]) -> list[str]:
+        """Return pending stages whose dependencies have finished, blocking any with a failed parent."""
+        blocked = {StageStatus.FAILED, StageStatus.BLOCKED}
+        changed = True
+        while changed:
+            changed = False
+            for name, deps in list(pending.items()):
+                if any(statuses.get(dep) in blocked for dep in deps):
+                    logger.warning("Stage %s blocked by failed upstream stage", name)
+                    statuses[name] = StageStatus.BLOCKED
+                    del pending[name]
+                    changed = True
+        return [name for name, deps in pending.items() if deps <= statuses.keys()]
+
+    def _execute(self, stage: Stage, force: bool) -> StageStatus:
+        key = self._stage_key(stage)
+        record = self._manifest["stages"].get(stage.name)
+        if not force and record and record["key"] == key and self._outputs_match(stage, record["outputs"]):
+            logger.info("Stage %s up to date, skipping", stage.name)
+            return StageStatus.SKIPPED
+
+        logger.info("Running stage %s", stage.name)
+        for output in stage.outputs:
+            output.parent.mkdir(parents=True, exist_ok=True)
+        stage.run()
+
+        missing = [str(p) for p in stage.outputs if not p.exists()]
+        if missing:
+            raise RuntimeError(f"Stage {stage.name} did not write: {', '.join(missing)}")
+
+        outputs = {str(p): self._hasher.hash(p) for p in stage.outputs}
+        with self._manifest_lock:
+            self._manifest["stages"][stage.name] = {"key": key, "outputs": outputs}
+            self._save_manifest()
+        return StageStatus.RAN
+
+    def _stage_key(self, stage: Stage) -> str:
+        missing = [str(p) for p in stage.inputs if not p.exists()]
+        if missing:
+            raise FileNotFoundError(f"Stage {stage.name} is missing inputs: {', '.join(missing)}")
+        payload = {
+            "name": stage.name,
+            "version": stage.version,
+            "inputs": [[str(p), self._hasher.hash(p)] for p in stage.inputs],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _outputs_match(self, stage: Stage, recorded: dict[str, str]) -> bool:
+        for output in stage.outputs:
+            if not output.exists() or recorded.get(str(output)) != self._hasher.hash(output):
+                return False
+        return True
+
+    def _check_acyclic(self) -> None:
+        visiting: set[str] = set()
+        visited: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through {name}")
+            visiting.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep)
+            visiting.remove(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == _MANIFEST_VERSION:
+                return manifest
+            logger.warning("Ignoring manifest with unknown version at %s", self.manifest_path)
+        return {"version": _MANIFEST_VERSION, "stages": {}, "files": {}}
+
+    def _save_manifest(self) -> None:
+        # Write-then-rename so an interrupted run never leaves a truncated manifest behind
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        manifest = {**self._manifest, "files": self._hasher.snapshot()}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
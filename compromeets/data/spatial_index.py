@@ -0,0 +1,59 @@
+"""
+Spatial index for point-in-area queries over large point sets (postcodes, venues).
+
+The points are packed into an STRtree once. A query first takes the tree's bounding-box hits,
+then runs a single vectorised exact predicate (``shapely.contains_xy``) on just those
+coordinates against the prepared query geometry, so no per-point Python work is done.
+"""
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+
+class PointIndex:
+    """STRtree over (lon, lat) points, optionally tagged with ids."""
+
+    def __init__(self, coords: np.ndarray, ids: np.ndarray | None = None):
+        """
+        Build the index.
+
+        Args:
+            coords: (n, 2) array of (lon, lat)
+            ids: Optional length-n array of identifiers returned by ``ids_within``
+
+        """
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        if ids is not None and len(ids) != len(self.coords):
+            raise ValueError("ids must have the same length as coords")
+        self.ids = ids
+        self.tree = shapely.STRtree(shapely.points(self.coords))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def query(self, area: BaseGeometry) -> np.ndarray:
+        """
+        Positions of the points strictly inside ``area``.
+
+        Args:
+            area: Polygon or MultiPolygon in the same (lon, lat) coordinates
+
+        Returns:
+            Sorted int array of positions into ``coords``
+
+        """
+        if area is None or area.is_empty:
+            return np.empty(0, dtype=np.intp)
+        shapely.prepare(area)
+        candidates = np.sort(self.tree.query(area))
+        if len(candidates) == 0:
+            return candidates
+        xy = self.coords[candidates]
+        # contains_xy excludes boundary points, matching GeoSeries.within
+        return candidates[shapely.contains_xy(area, xy[:, 0], xy[:, 1])]
+
+    def ids_within(self, area: BaseGeometry) -> np.ndarray:
+        """Identifiers of the points inside ``area`` (positions if the index has no ids)."""
+        positions = self.query(area)
+        return positions if self.ids is None else self.ids[positions]
@@ -0,0 +1,133 @@
+"""
+Stage declarations for the nightly ingestion refresh.
+
+Each stage shells out to the matching standalone script in ``scripts/`` so the scripts stay
+usable on their own; this module only declares what each one reads and writes. Layout under
+the artifacts directory:
+
+    bods_transxchange/<operator>        one .zip/.xml/directory per BODS operator
+    journey-planner-timetables.zip      TfL TransXChange
+    Stops.csv                           NaPTAN stops, used to fix stop coordinates
+    gtfs/bods/<operator>.zip            converted BODS feeds (one stage per operator)
+    tfl-gtfs.zip                        converted TfL feed
+    *.osm.pbf                           Geofabrik extract (the last by name is used)
+    travel_time_table/                  precomputed zone-to-zone travel times
+    venues.npz                          OSM amenity POIs for local venue search
+"""
+
+import os
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+from compromeets.config import ARTIFACTS_DIR, PROJECT_ROOT
+from compromeets.data.pipeline import Stage
+
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+
+
+def _script_runner(script: str, *args: Path | str) -> Callable[[], None]:
+    """Build a stage callable that runs ``scripts/<script>`` from the project root."""
+
+    def run() -> None:
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+        cmd = [sys.executable, str(SCRIPTS_DIR / script), *(str(a) for a in args)]
+        subprocess.run(cmd, check=True, cwd=PROJECT_ROOT, env=env)
+
+    return run
+
+
+def transxchange_stage(name: str, input_path: Path, output_path: Path, naptan_csv: Path | None) -> Stage:
+    """Declare a TransXChange -> GTFS conversion for a single feed."""
+    inputs = [input_path] if naptan_csv is None else [input_path, naptan_csv]
+    naptan_args = [] if naptan_csv is None else ["--naptan", naptan_csv]
+    return Stage(
+        name=f"transxchange:{name}",
+        run=_script_runner("ingest_transxchange.py", input_path, output_path, *naptan_args),
+        inputs=inputs,
+        outputs=[output_path],
+    )
+
+
+def travel_time_table_stage(osm_pbf: Path, gtfs_feeds: list[Path], output_dir: Path) -> Stage:
+    """
+    Declare the zone-to-zone travel time table build, which depends on every GTFS feed.
+
+    The script picks its departure dates inside the feeds' service window, so a refreshed
+    feed both reruns the stage and moves the dates with it.
+    """
+    gtfs_args = [str(p) for p in gtfs_feeds]
+    return Stage(
+        name="travel_time_table",
+        run=_script_runner(
+            "build_travel_time_table.py", "--osm", osm_pbf, "--gtfs", *gtfs_args, "--output", output_dir
+        ),
+        inputs=[osm_pbf, *gtfs_feeds],
+        outputs=[output_dir],
+    )
+
+
+def venue_index_stage(osm_pbf: Path, output_path: Path) -> Stage:
+    """Declare the OSM venue extraction."""
+    return Stage(
+        name="venue_index",
+        run=_script_runner("build_venue_index.py", osm_pbf, output_path),
+        inputs=[osm_pbf],
+        outputs=[output_path],
+    )
+
+
+def latest_osm_extract(artifacts_dir: Path | str = ARTIFACTS_DIR) -> Path | None:
+    """The OSM extract stages and services use: the last ``*.osm.pbf`` by name (names end in the date)."""
+    extracts = sorted(Path(artifacts_dir).glob("*.osm.pbf"))
+    return extracts[-1] if extracts else None
+
+
+def existing_gtfs_feeds(artifacts_dir: Path | str = ARTIFACTS_DIR) -> list[Path]:
+    """GTFS feeds already produced by the TransXChange stages."""
+    artifacts_dir = Path(artifacts_dir)
+    feeds = sorted((artifacts_dir / "gtfs").rglob("*.zip"))
+    if (artifacts_dir / "tfl-gtfs.zip").exists():
+        feeds.append(artifacts_dir / "tfl-gtfs.zip")
+    return feeds
+
+
+def build_ingest_stages(artifacts_dir: Path | str = ARTIFACTS_DIR) -> list[Stage]:
+    """
+    Declare every ingestion stage whose raw inputs are present.
+
+    Args:
+        artifacts_dir: Root of the artifacts tree described in the module docstring
+
+    Returns:
+        Stages ready to hand to ``PipelineRunner``
+
+    """
+    artifacts_dir = Path(artifacts_dir)
+    naptan_csv = artifacts_dir / "Stops.csv"
+    naptan = naptan_csv if naptan_csv.exists() else None
+    stages = []
+
+    # One stage per operator, so a change to one operator's timetables only reconverts that operator
+    bods_dir = artifacts_dir / "bods_transxchange"
+    if bods_dir.is_dir():
+        for operator in sorted(bods_dir.iterdir()):
+            if operator.name.startswith("."):
+                continue
+            output = artifacts_dir / "gtfs" / "bods" / f"{operator.stem}.zip"
+            stages.append(transxchange_stage(f"bods:{operator.stem}", operator, output, naptan))
+
+    tfl_input = artifacts_dir / "journey-planner-timetables.zip"
+    if tfl_input.exists():
+        stages.append(transxchange_stage("tfl", tfl_input, artifacts_dir / "tfl-gtfs.zip", naptan))
+
+    gtfs_feeds = [output for stage in stages for output in stage.outputs]
+    osm_pbf = latest_osm_extract(artifacts_dir)
+    if osm_pbf is not None and gtfs_feeds:
+        stages.append(travel_time_table_stage(osm_pbf, gtfs_feeds, artifacts_dir / "travel_time_table"))
+    if osm_pbf is not None:
+        stages.append(venue_index_stage(osm_pbf, artifacts_dir / "venues.npz"))
+
+    return stages
@@ -0,0 +1,291 @@
+"""
+Precomputed zone-to-zone travel time tables.
+
+Transit stops are snapped to a regular grid and each occupied cell becomes a zone. For every
+standard departure slot, r5py routes zone-to-zone once offline and the result is stored as a
+square ``uint16`` matrix of minutes, which is memory-mapped at query time. A table directory
+contains:
+
+    meta.json           slot names -> departure datetimes, plus build settings
+    zones.npy           float64 (n, 2) zone centres as (lon, lat)
+    times_<slot>.npy    uint16 (n, n) minutes from row zone to column zone
+
+Unreachable pairs (beyond ``max_time_minutes``) are stored as ``UNREACHABLE``.
+"""
+
+import datetime
+import json
+import logging
+import math
+import zipfile
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import r5py
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE = np.iinfo(np.uint16).max
+METRES_PER_DEGREE_LAT = 110_540.0
+METRES_PER_DEGREE_LON = 111_320.0
+# The table is routed with these modes, so it only answers questions about them
+TABLE_TRANSPORT_MODES = ("TRANSIT", "WALK")
+TUESDAY = 1
+SATURDAY = 5
+
+# Slot name -> (day type, time of day); dates come from the feeds via ``slots_for_feeds``
+SLOT_TIMES = {
+    "weekday_0800": ("weekday", datetime.time(8, 0)),
+    "weekday_1800": ("weekday", datetime.time(18, 0)),
+    "weekend_1200": ("weekend", datetime.time(12, 0)),
+}
+# Skip the first days of a feed, which often start on a holiday or a timetable change
+_SETTLE_DAYS = 7
+# Transit is assumed to have been routed if some trips beat walking at this speed
+_FASTER_THAN_WALKING_KMH = 7.0
+
+
+def zones_from_gtfs(gtfs_paths: Sequence[Path | str], cell_size_m: float = 250.0) -> np.ndarray:
+    """
+    Build zone centres by snapping GTFS stops to a square grid.
+
+    Args:
+        gtfs_paths: Paths to GTFS .zip feeds
+        cell_size_m: Grid cell edge length in metres
+
+    Returns:
+        float64 array of shape (n, 2) holding the mean (lon, lat) of the stops in each cell
+
+    """
+    frames = []
+    for gtfs_path in gtfs_paths:
+        with zipfile.ZipFile(gtfs_path) as z, z.open("stops.txt") as f:
+            frames.append(pd.read_csv(f, usecols=["stop_lat", "stop_lon"]))
+    stops = pd.concat(frames, ignore_index=True).dropna()
+    # transxchange2gtfs writes 0,0 for stops it couldn't locate
+    stops = stops[(stops["stop_lat"] != 0) | (stops["stop_lon"] != 0)]
+    return snap_to_grid(stops[["stop_lon", "stop_lat"]].to_numpy(dtype=np.float64), cell_size_m)
+
+
+def gtfs_service_window(gtfs_paths: Sequence[Path | str]) -> tuple[datetime.date, datetime.date]:
+    """
+    The date range every feed has service in, from ``calendar.txt`` and ``calendar_dates.txt``.
+
+    Raises:
+        ValueError: If a feed has no service dates or the feeds share no dates
+
+    """
+    start, end = datetime.date.min, datetime.date.max
+    for gtfs_path in gtfs_paths:
+        dates = []
+        with zipfile.ZipFile(gtfs_path) as z:
+            names = set(z.namelist())
+            if "calendar.txt" in names:
+                with z.open("calendar.txt") as f:
+                    calendar = pd.read_csv(f, usecols=["start_date", "end_date"], dtype=str)
+                dates += [*calendar["start_date"], *calendar["end_date"]]
+            if "calendar_dates.txt" in names:
+                with z.open("calendar_dates.txt") as f:
+                    calendar_dates = pd.read_csv(f, usecols=["date", "exception_type"], dtype=str)
+                dates += list(calendar_dates.loc[calendar_dates["exception_type"] == "1", "date"])
+        if not dates:
+            raise ValueError(f"No service dates in {gtfs_path}")
+        parsed = [datetime.datetime.strptime(d, "%Y%m%d").date() for d in dates]
+        start, end = max(start, min(parsed)), min(end, max(parsed))
+    if start > end:
+        raise ValueError("GTFS feeds have no service dates in common")
+    return start, end
+
+
+def slots_for_feeds(
+    gtfs_paths: Sequence[Path | str],
+    weekday: datetime.date | None = None,
+    weekend: datetime.date | None = None,
+) -> dict[str, datetime.datetime]:
+    """
+    Departure datetimes for ``SLOT_TIMES`` on representative dates inside the feeds' service window.
+
+    The weekday slots use the first Tuesday and the weekend slot the first Saturday at least a
+    week into the window (or the first in the window, if it is short).
+
+    Args:
+        gtfs_paths: GTFS .zip feeds the table will be routed on
+        weekday: Use this date for the weekday slots instead
+        weekend: Use this date for the weekend slot instead
+
+    Raises:
+        ValueError: If the window contains no Tuesday or Saturday and no date was given
+
+    """
+    if weekday is None or weekend is None:
+        start, end = gtfs_service_window(gtfs_paths)
+        weekday = weekday or _first_weekday(start, end, TUESDAY)
+        weekend = weekend or _first_weekday(start, end, SATURDAY)
+    dates = {"weekday": weekday, "weekend": weekend}
+    return {slot: datetime.datetime.combine(dates[day], time) for slot, (day, time) in SLOT_TIMES.items()}
+
+
+def _first_weekday(start: datetime.date, end: datetime.date, weekday: int) -> datetime.date:
+    for earliest in (start + datetime.timedelta(days=_SETTLE_DAYS), start):
+        candidate = earliest + datetime.timedelta(days=(weekday - earliest.weekday()) % 7)
+        if candidate <= end:
+            return candidate
+    raise ValueError(f"GTFS service window {start} to {end} has no day {weekday} of the week")
+
+
+def snap_to_grid(points: np.ndarray, cell_size_m: float) -> np.ndarray:
+    """Collapse (lon, lat) points into the mean point of each occupied grid cell."""
+    if len(points) == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    lon_scale = METRES_PER_DEGREE_LON * math.cos(math.radians(float(points[:, 1].mean())))
+    cells = np.floor(points * [lon_scale / cell_size_m, METRES_PER_DEGREE_LAT / cell_size_m]).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    centres = np.empty((len(counts), 2), dtype=np.float64)
+    for dim in range(2):
+        centres[:, dim] = np.bincount(inverse, weights=points[:, dim]) / counts
+    return centres
+
+
+class TravelTimeTable:
+    """A loaded (memory-mapped) zone-to-zone travel time table."""
+
+    def __init__(
+        self,
+        zones: np.ndarray,
+        times: Mapping[str, np.ndarray],
+        departures: Mapping[str, datetime.datetime],
+        max_time_minutes: float = 120,
+    ):
+        self.zones = zones
+        self.times = dict(times)
+        self.departures = dict(departures)
+        # Routing cut-off the table was built with; nothing longer is known to be reachable
+        self.max_time_minutes = max_time_minutes
+
+    @classmethod
+    def load(cls, path: Path | str) -> "TravelTimeTable":
+        """
+        Open a table directory without reading the matrices into memory.
+
+        Args:
+            path: Directory written by ``build_travel_time_table``
+
+        """
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        departures = {slot: datetime.datetime.fromisoformat(dt) for slot, dt in meta["slots"].items()}
+        times = {slot: np.load(path / f"times_{slot}.npy", mmap_mode="r") for slot in departures}
+        return cls(np.load(path / "zones.npy"), times, departures, meta["max_time_minutes"])
+
+    def slot_for(self, departure: datetime.datetime) -> str:
+        """Pick the slot with the same weekday/weekend type and closest time of day to ``departure``."""
+
+        def distance(slot: str) -> tuple[bool, int]:
+            slot_dt = self.departures[slot]
+            day_type_differs = (slot_dt.weekday() >= SATURDAY) != (departure.weekday() >= SATURDAY)
+            minutes = abs((slot_dt.hour * 60 + slot_dt.minute) - (departure.hour * 60 + departure.minute))
+            return day_type_differs, minutes
+
+        return min(self.departures, key=distance)
+
+
+def build_travel_time_table(
+    transport_network: "r5py.TransportNetwork",
+    zones: np.ndarray,
+    output_dir: Path | str,
+    *,
+    departures: Mapping[str, datetime.datetime],
+    max_time_minutes: int = 120,
+    chunk_size: int = 500,
+) -> None:
+    """
+    Route every zone to every other zone for each departure slot and write the table.
+
+    Origins are routed in chunks and written straight into a memory-mapped output file, so
+    peak memory is bounded by ``chunk_size * n`` rather than ``n * n`` result rows.
+
+    A departure outside the feeds' calendar still routes, but on foot only; a slot in which
+    no trip beats walking fails the build rather than storing walking times as transit.
+
+    Args:
+        transport_network: Loaded r5py network
+        zones: float64 (n, 2) zone centres as (lon, lat), e.g. from ``zones_from_gtfs``
+        output_dir: Directory to write the table to
+        departures: Slot name -> departure datetime, e.g. from ``slots_for_feeds``
+        max_time_minutes: Routing cut-off; longer trips are stored as ``UNREACHABLE``
+        chunk_size: Number of origin zones routed per r5py call
+
+    Raises:
+        RuntimeError: If no transit trips were routed for a slot
+
+    """
+    import geopandas as gpd
+    import r5py
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "meta.json").unlink(missing_ok=True)
+    n = len(zones)
+    points = gpd.GeoDataFrame(
+        {"id": np.arange(n)}, geometry=gpd.points_from_xy(zones[:, 0], zones[:, 1]), crs="EPSG:4326"
+    )
+
+    for slot, departure in departures.items():
+        logger.info("Routing %d zones for slot %s", n, slot)
+        times = np.lib.format.open_memmap(output_dir / f"times_{slot}.npy", mode="w+", dtype=np.uint16, shape=(n, n))
+        times[:] = UNREACHABLE
+        transit_trips = 0
+        for start in range(0, n, chunk_size):
+            matrix = r5py.TravelTimeMatrix(
+                transport_network=transport_network,
+                origins=points.iloc[start : start + chunk_size],
+                destinations=points,
+                departure=departure,
+                transport_modes=[r5py.TransportMode[mode] for mode in TABLE_TRANSPORT_MODES],
+                max_time=datetime.timedelta(minutes=max_time_minutes),
+            ).dropna(subset=["travel_time"])
+            from_id, to_id = matrix["from_id"].to_numpy(), matrix["to_id"].to_numpy()
+            minutes = matrix["travel_time"].to_numpy()
+            times[from_id, to_id] = minutes
+            transit_trips += count_faster_than_walking(zones[from_id], zones[to_id], minutes)
+        times.flush()
+        del times
+        if transit_trips == 0:
+            raise RuntimeError(
+                f"No transit trips routed for slot {slot} at {departure}; is it inside the GTFS service dates?"
+            )
+        logger.info("Slot %s: %d zone pairs faster than walking", slot, transit_trips)
+
+    np.save(output_dir / "zones.npy", zones)
+    # meta.json is written last, so a table interrupted mid-build is never loadable
+    with open(output_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {"slots": {slot: dt.isoformat() for slot, dt in departures.items()}, "max_time_minutes": max_time_minutes},
+            f,
+            indent=2,
+        )
+
+
+def count_faster_than_walking(origins: np.ndarray, destinations: np.ndarray, minutes: np.ndarray) -> int:
+    """
+    Number of trips quicker than a brisk straight-line walk, which only transit can manage.
+
+    Args:
+        origins: (k, 2) array of (lon, lat)
+        destinations: (k, 2) array of (lon, lat), paired with ``origins``
+        minutes: Length-k travel times
+
+    """
+    lon_scale = METRES_PER_DEGREE_LON * np.cos(np.radians((origins[:, 1] + destinations[:, 1]) / 2))
+    distance_m = np.hypot(
+        (destinations[:, 0] - origins[:, 0]) * lon_scale, (destinations[:, 1] - origins[:, 1]) * METRES_PER_DEGREE_LAT
+    )
+    walk_minutes = distance_m / (_FASTER_THAN_WALKING_KMH * 1000 / 60)
+    return int(np.count_nonzero(minutes < walk_minutes))
@@ -0,0 +1,64 @@
+"""
+Compact, spatially indexed store of candidate venues extracted from OpenStreetMap.
+
+Venues are held column-wise in a ``Venues`` model and saved as a single ``.npz``; loading one
+builds a ``PointIndex`` over the coordinates so area queries never touch per-venue Python
+objects.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.data.spatial_index import PointIndex
+from compromeets.models.domain import VENUE_KINDS, Venues
+
+
+class VenueIndex:
+    """Venue columns with a spatial index over their locations."""
+
+    def __init__(self, venues: Venues):
+        self.venues = venues
+        self.index = PointIndex(venues.coords)
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "VenueIndex":
+        with np.load(path) as data:
+            return cls(Venues(data["coords"], data["kinds"], data["names"], data["osm_ids"]))
+
+    def save(self, path: Path | str) -> None:
+        venues = self.venues
+        np.savez_compressed(path, coords=venues.coords, kinds=venues.kinds, names=venues.names, osm_ids=venues.osm_ids)
+
+    def query(self, area: BaseGeometry, kinds: list[str] | None = None) -> np.ndarray:
+        """
+        Positions of the venues inside ``area``.
+
+        Args:
+            area: Polygon or MultiPolygon in (lon, lat)
+            kinds: Restrict to these ``VENUE_KINDS``; all kinds if omitted
+
+        Returns:
+            Sorted int array of positions
+
+        """
+        positions = self.index.query(area)
+        if kinds is None:
+            return positions
+        return positions[np.isin(self.venues.kinds[positions], kind_codes(kinds))]
+
+    def venues_in(self, area: BaseGeometry, kinds: list[str] | None = None) -> Venues:
+        """The venues inside ``area``."""
+        return self.venues.take(self.query(area, kinds))
+
+
+def kind_codes(kinds: list[str]) -> np.ndarray:
+    """Map venue kind names to their stored codes."""
+    unknown = set(kinds) - set(VENUE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown venue kinds: {', '.join(sorted(unknown))}")
+    return np.array([VENUE_KINDS.index(kind) for kind in kinds], dtype=np.uint8)
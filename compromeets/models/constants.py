@@ -0,0 +1,12 @@
+"""
+Constants shared by the domain and boundary models.
+
+Kept free of third-party imports so the CLI can offer them as argument choices without
+loading numpy.
+"""
+
+# OSM amenity values we treat as meeting places; position is the stored kind code
+VENUE_KINDS = ("pub", "bar", "cafe", "restaurant")
+# r5py.TransportMode names accepted in requests
+TRANSPORT_MODES = ("TRANSIT", "WALK", "BICYCLE", "CAR", "BUS", "RAIL", "SUBWAY", "TRAM", "FERRY")
+DEFAULT_TRANSPORT_MODES = ("TRANSIT", "WALK")
@@ -1 +1,180 @@
-# Pydantic models for the domain
+"""
+Internal domain models.
+
+These are the types passed between services on the hot path. They are frozen, slotted
+dataclasses whose bulk data lives in NumPy arrays (column-wise), so moving a group's origins
+or a few thousand candidate venues between services costs no per-object construction or
+validation. Arrays are stored as read-only views of what was passed in; nothing is copied
+unless a dtype conversion is needed. Validation of untrusted input happens once, at the API
+boundary, in ``compromeets.models.inputs``.
+
+All coordinates are (lon, lat) in EPSG:4326.
+"""
+
+import datetime
+from dataclasses import dataclass, field
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.models.constants import DEFAULT_TRANSPORT_MODES, VENUE_KINDS
+
+UNKNOWN_KIND = np.iinfo(np.uint8).max
+
+
+def _frozen_array(value, dtype, shape: tuple[int | None, ...] | None = None) -> np.ndarray:
+    """A read-only view of ``value`` as ``dtype``, copying only if the dtype differs."""
+    array = np.asarray(value, dtype=dtype)
+    if shape is not None:
+        array = array.reshape(tuple(-1 if dim is None else dim for dim in shape))
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _set(obj, **values) -> None:
+    for name, value in values.items():
+        object.__setattr__(obj, name, value)
+
+
+def _check_length(name: str, array: np.ndarray, n: int) -> None:
+    if len(array) != n:
+        raise ValueError(f"{name} has length {len(array)}, expected {n}")
+
+
+def _travel_times(value, n: int) -> np.ndarray | None:
+    """Validate an optional (people, n) matrix of minutes."""
+    if value is None:
+        return None
+    travel_times = _frozen_array(value, np.float32)
+    if travel_times.shape[1:] != (n,):
+        raise ValueError(f"travel_times has shape {travel_times.shape}, expected (people, {n})")
+    return travel_times
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Origins:
+    coords: np.ndarray  # (n, 2) float64
+    labels: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        _set(self, coords=_frozen_array(self.coords, np.float64, (None, 2)), labels=tuple(self.labels))
+        if self.labels:
+            _check_length("labels", np.asarray(self.labels), len(self.coords))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Group:
+    """The people meeting up and when and how they are travelling."""
+
+    origins: Origins
+    departure: datetime.datetime
+    transport_modes: tuple[str, ...] = DEFAULT_TRANSPORT_MODES
+    budget_ratio: float = 0.7  # isochrone budget as a fraction of the longest pairwise trip
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CandidateCells:
+    """Candidate meeting points (e.g. postcodes in the overlap) with optional per-person travel times."""
+
+    coords: np.ndarray  # (n, 2) float64
+    ids: np.ndarray  # (n,)
+    travel_times: np.ndarray | None = None  # (people, n) float32 minutes
+
+    def __post_init__(self):
+        _set(self, coords=_frozen_array(self.coords, np.float64, (None, 2)), ids=_frozen_array(self.ids, None))
+        _check_length("ids", self.ids, len(self.coords))
+        _set(self, travel_times=_travel_times(self.travel_times, len(self.coords)))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    @classmethod
+    def empty(cls) -> "CandidateCells":
+        return cls(np.empty((0, 2)), np.empty(0, dtype=object))
+
+    def take(self, positions: np.ndarray) -> "CandidateCells":
+        """The cells at ``positions``, in that order."""
+        travel_times = None if self.travel_times is None else self.travel_times[:, positions]
+        return CandidateCells(self.coords[positions], self.ids[positions], travel_times)
+
+    def with_travel_times(self, travel_times: np.ndarray) -> "CandidateCells":
+        """A copy sharing the coordinates and ids, with ``travel_times`` from each person."""
+        return CandidateCells(self.coords, self.ids, travel_times)
+
+    def longest_trips(self) -> np.ndarray:
+        """Each cell's longest travel time over the people, ``inf`` where anyone's is unknown."""
+        if self.travel_times is None or len(self.travel_times) == 0:
+            return np.full(len(self), np.inf, dtype=np.float32)
+        return np.where(np.isnan(self.travel_times), np.inf, self.travel_times).max(axis=0)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Venues:
+    """Column store of venues; ratings are ``nan`` and rating counts ``-1`` where unknown."""
+
+    coords: np.ndarray  # (n, 2) float64
+    kinds: np.ndarray  # (n,) uint8 positions into VENUE_KINDS, or UNKNOWN_KIND
+    names: np.ndarray  # (n,) str
+    osm_ids: np.ndarray  # (n,) int64; nodes positive, ways negative, 0 if not from OSM
+    ratings: np.ndarray = field(default=None)  # (n,) float32
+    rating_counts: np.ndarray = field(default=None)  # (n,) int32
+    travel_times: np.ndarray | None = None  # (people, n) float32 minutes
+
+    def __post_init__(self):
+        coords = _frozen_array(self.coords, np.float64, (None, 2))
+        n = len(coords)
+        _set(
+            self,
+            coords=coords,
+            kinds=_frozen_array(self.kinds, np.uint8),
+            names=_frozen_array(self.names, str),
+            osm_ids=_frozen_array(self.osm_ids, np.int64),
+            ratings=_frozen_array(np.full(n, np.nan) if self.ratings is None else self.ratings, np.float32),
+            rating_counts=_frozen_array(np.full(n, -1) if self.rating_counts is None else self.rating_counts, np.int32),
+        )
+        for name in ("kinds", "names", "osm_ids", "ratings", "rating_counts"):
+            _check_length(name, getattr(self, name), n)
+        _set(self, travel_times=_travel_times(self.travel_times, n))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    @classmethod
+    def empty(cls) -> "Venues":
+        return cls(np.empty((0, 2)), np.empty(0), np.empty(0, dtype=str), np.empty(0))
+
+    def take(self, positions: np.ndarray) -> "Venues":
+        """The venues at ``positions``, in that order."""
+        return Venues(
+            self.coords[positions],
+            self.kinds[positions],
+            self.names[positions],
+            self.osm_ids[positions],
+            self.ratings[positions],
+            self.rating_counts[positions],
+            None if self.travel_times is None else self.travel_times[:, positions],
+        )
+
+    def with_ratings(self, ratings: np.ndarray, rating_counts: np.ndarray) -> "Venues":
+        """A copy sharing every column except the ratings."""
+        return Venues(self.coords, self.kinds, self.names, self.osm_ids, ratings, rating_counts, self.travel_times)
+
+    def with_travel_times(self, travel_times: np.ndarray) -> "Venues":
+        """A copy sharing every column, with ``travel_times`` from each person."""
+        return Venues(self.coords, self.kinds, self.names, self.osm_ids, self.ratings, self.rating_counts, travel_times)
+
+    def kind_names(self) -> list[str]:
+        return [VENUE_KINDS[k] if k < len(VENUE_KINDS) else "" for k in self.kinds]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class MeetingArea:
+    overlap: BaseGeometry
+    center: tuple[float, float]
+    radius_m: float
+    postcodes: CandidateCells = field(default_factory=CandidateCells.empty)
+    venues: Venues = field(default_factory=Venues.empty)
@@ -0,0 +1,107 @@
+"""
+Pydantic models for the API boundary.
+
+Requests are validated here once and then converted into the array-backed models in
+``compromeets.models.domain``; nothing past this point re-validates per object.
+"""
+
+import datetime
+from typing import Literal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from compromeets.models.constants import DEFAULT_TRANSPORT_MODES, TRANSPORT_MODES, VENUE_KINDS
+from compromeets.models.domain import Group, Origins, Venues
+
+VenueKind = Literal[VENUE_KINDS]
+TransportMode = Literal[TRANSPORT_MODES]
+
+
+class SuggestRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    postcodes: list[str] = Field(min_length=2, description="One postcode per person")
+    departure: datetime.datetime
+    venue_kinds: list[VenueKind] = Field(default=["pub"], min_length=1)
+    transport_modes: list[TransportMode] = Field(default=list(DEFAULT_TRANSPORT_MODES), min_length=1)
+    budget_ratio: float = Field(
+        default=0.7, gt=0, le=1, description="Isochrone budget as a fraction of the longest trip"
+    )
+    zoom: int | None = Field(
+        default=None,
+        ge=0,
+        le=22,
+        description="Return geometries as TopoJSON simplified for this web map zoom instead of full GeoJSON",
+    )
+
+    @field_validator("postcodes")
+    @classmethod
+    def _strip_postcodes(cls, postcodes: list[str]) -> list[str]:
+        stripped = [p.strip().upper() for p in postcodes]
+        if not all(stripped):
+            raise ValueError("postcodes must not be blank")
+        return stripped
+
+    def to_group(self, coords: np.ndarray) -> Group:
+        """
+        Convert to the domain model.
+
+        Args:
+            coords: (n, 2) array of (lon, lat) for ``postcodes``, e.g. from ``PostcodeResolver.resolve_many``
+
+        """
+        return Group(
+            origins=Origins(coords, labels=tuple(self.postcodes)),
+            departure=self.departure,
+            transport_modes=tuple(self.transport_modes),
+            budget_ratio=self.budget_ratio,
+        )
+
+
+class VenueSuggestion(BaseModel):
+    name: str
+    kind: str
+    latitude: float
+    longitude: float
+    rating: float | None = None
+    user_rating_count: int | None = None
+    travel_minutes: list[float | None] = Field(default=[], description="Travel time from each postcode, in order")
+
+    @classmethod
+    def from_venues(cls, venues: Venues) -> list["VenueSuggestion"]:
+        """Build response items from a venue column store; the only per-venue objects made on a request."""
+        travel_times = np.empty((len(venues), 0)) if venues.travel_times is None else venues.travel_times.T
+        return [
+            cls(
+                name=str(name),
+                kind=kind,
+                latitude=float(lat),
+                longitude=float(lon),
+                rating=None if np.isnan(rating) else float(rating),
+                user_rating_count=None if count < 0 else int(count),
+                travel_minutes=[round(float(t), 1) if np.isfinite(t) else None for t in times],
+            )
+            for (lon, lat), kind, name, rating, count, times in zip(
+                venues.coords,
+                venues.kind_names(),
+                venues.names,
+                venues.ratings,
+                venues.rating_counts,
+                travel_times,
+                strict=True,
+            )
+        ]
+
+
+class SuggestResponse(BaseModel):
+    request_id: str | None = Field(default=None, description="Key for fetching the map at other zooms")
+    budget_minutes: float
+    center_latitude: float | None = None
+    center_longitude: float | None = None
+    radius_m: float = 0.0
+    postcodes_in_overlap: int = 0
+    sample_postcodes: list[str] = []
+    venues: list[VenueSuggestion] = []
+    overlap: dict | None = Field(default=None, description="Overlap polygon as GeoJSON, unless a zoom was requested")
+    map: dict | None = Field(default=None, description="Isochrones, overlap and postcodes as TopoJSON")
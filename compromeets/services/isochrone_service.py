@@ -1 +1,109 @@
 # Service for calculating isochrones and overlap from r5py
+import math
+from collections.abc import Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.data.travel_time_table import METRES_PER_DEGREE_LAT, METRES_PER_DEGREE_LON
+
+# Reference latitude for the lattice's longitude spacing, so every origin shares one lattice;
+# cells are square here and within about 15% of square across Great Britain
+LATTICE_LATITUDE = 54.0
+
+
+# Upper bounds on average door-to-door speed, which set how far an isochrone grid must reach
+REACH_SPEED_KMH = {
+    "WALK": 6.0,
+    "BICYCLE": 20.0,
+    "TRANSIT": 30.0,
+    "BUS": 30.0,
+    "TRAM": 30.0,
+    "SUBWAY": 30.0,
+    "FERRY": 30.0,
+    "RAIL": 50.0,
+    "CAR": 60.0,
+}
+
+
+def reach_speed_kmh(transport_modes: Sequence[str]) -> float:
+    """Fastest plausible average speed for a trip using any of ``transport_modes``."""
+    return max(REACH_SPEED_KMH.get(mode, REACH_SPEED_KMH["TRANSIT"]) for mode in transport_modes)
+
+
+def lattice_steps(resolution_m: float) -> tuple[float, float]:
+    """(lon, lat) spacing in degrees of the global isochrone lattice at ``resolution_m``."""
+    lon_scale = METRES_PER_DEGREE_LON * math.cos(math.radians(LATTICE_LATITUDE))
+    return resolution_m / lon_scale, resolution_m / METRES_PER_DEGREE_LAT
+
+
+def isochrone_grid(
+    origin: tuple[float, float], max_minutes: float, resolution_m: float = 200.0, reach_speed_kmh: float = 30.0
+) -> np.ndarray:
+    """
+    Points of the global lattice around ``origin`` covering everywhere reachable in time.
+
+    Isochrones are built by routing from the origin to every grid point, so the grid must
+    extend at least as far as the fastest plausible trip; ``reach_speed_kmh`` bounds that.
+    Points are whole multiples of ``lattice_steps``, so grids around nearby origins share
+    their points exactly and a batch of them deduplicates to little more than one grid.
+
+    Args:
+        origin: (lon, lat)
+        max_minutes: Largest isochrone cutoff
+        resolution_m: Grid spacing in metres
+        reach_speed_kmh: Upper bound on average door-to-door speed
+
+    Returns:
+        (n, 2) array of (lon, lat)
+
+    """
+    lon, lat = origin
+    radius_m = reach_speed_kmh * 1000 / 60 * max_minutes
+    step_lon, step_lat = lattice_steps(resolution_m)
+    lon_scale = METRES_PER_DEGREE_LON * math.cos(math.radians(lat))
+    span_lon, span_lat = radius_m / lon_scale, radius_m / METRES_PER_DEGREE_LAT
+    i = np.arange(math.floor((lon - span_lon) / step_lon), math.ceil((lon + span_lon) / step_lon) + 1)
+    j = np.arange(math.floor((lat - span_lat) / step_lat), math.ceil((lat + span_lat) / step_lat) + 1)
+    grid_i, grid_j = np.meshgrid(i, j)
+    lons, lats = grid_i.ravel() * step_lon, grid_j.ravel() * step_lat
+    keep = np.hypot((lons - lon) * lon_scale, (lats - lat) * METRES_PER_DEGREE_LAT) <= radius_m
+    return np.column_stack([lons[keep], lats[keep]])
+
+
+def isochrones_from_times(
+    grid: np.ndarray, travel_times: np.ndarray, cutoffs: Sequence[float], resolution_m: float = 200.0
+) -> list[BaseGeometry]:
+    """
+    Polygons covering the grid cells reachable within each cutoff.
+
+    Each reachable grid point contributes a cell of side ``resolution_m``; the cells are
+    unioned, so disconnected pockets around stations are preserved rather than hulled over.
+
+    Args:
+        grid: (n, 2) array of (lon, lat) from ``isochrone_grid``
+        travel_times: Length-n minutes from the origin to each grid point; ``nan`` if unreachable
+        cutoffs: Isochrone cutoffs in minutes
+        resolution_m: The grid's spacing
+
+    Returns:
+        One (Multi)Polygon per cutoff, in the order given
+
+    """
+    if len(grid) == 0:
+        return [shapely.Polygon() for _ in cutoffs]
+    # Slightly oversized cells so neighbours overlap and union without slivers
+    step_lon, step_lat = lattice_steps(resolution_m)
+    half_lon, half_lat = step_lon * 0.51, step_lat * 0.51
+    polygons = []
+    for cutoff in cutoffs:
+        reachable = grid[np.nan_to_num(travel_times, nan=np.inf) <= cutoff]
+        cells = shapely.box(
+            reachable[:, 0] - half_lon,
+            reachable[:, 1] - half_lat,
+            reachable[:, 0] + half_lon,
+            reachable[:, 1] + half_lat,
+        )
+        polygons.append(shapely.union_all(cells) if len(cells) else shapely.Polygon())
+    return polygons
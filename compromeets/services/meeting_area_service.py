@@ -1,3 +1,122 @@
 # Inputs: two (or N) origins, mode(s), time budget policy (e.g. “70% of pairwise time”)
 # Output: overlap polygon(s) + derived search centers (centroid/representative point)
 # + search radius (and/or a list of seed points)
+import logging
+from collections.abc import Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.data.spatial_index import PointIndex
+from compromeets.data.venue_index import VenueIndex
+from compromeets.models.domain import CandidateCells, MeetingArea, Venues
+from compromeets.services.travel_time_service import distance_matrix_m
+
+logger = logging.getLogger(__name__)
+
+
+def _polygonal_part(geometry: BaseGeometry) -> BaseGeometry:
+    """The polygons of ``geometry``, dropping the lines and points an intersection leaves where shapes only touch."""
+    if geometry.geom_type in ("Polygon", "MultiPolygon"):
+        return geometry
+    polygons = [part for part in shapely.get_parts(geometry) if part.geom_type in ("Polygon", "MultiPolygon")]
+    return shapely.union_all(polygons) if polygons else shapely.Polygon()
+
+
+class MeetingAreaService:
+    """Intersects per-person isochrones and finds the postcodes and venues inside the overlap."""
+
+    def __init__(self, postcode_index: PointIndex | None = None, venue_index: VenueIndex | None = None):
+        """
+        Initialize the service.
+
+        Args:
+            postcode_index: Index over postcode locations, e.g. ``PostcodeResolver.index``
+            venue_index: Local venue index
+
+        """
+        self.postcode_index = postcode_index
+        self.venue_index = venue_index
+
+    def find_meeting_area(
+        self, isochrones: Sequence[BaseGeometry], venue_kinds: list[str] | None = None
+    ) -> MeetingArea:
+        """
+        Find the area reachable by everyone and what lies inside it.
+
+        Args:
+            isochrones: One polygon per person, in (lon, lat)
+            venue_kinds: Look up local venues of these kinds in the overlap; venues are left
+                empty if omitted, as ``PlaceSearchService.search`` does its own lookup
+
+        Returns:
+            The overlap, a search centre and radius covering it, and the indexed postcodes
+            (and venues, if kinds were given) inside it
+
+        Raises:
+            ValueError: If no isochrones are given
+
+        """
+        if len(isochrones) == 0:
+            raise ValueError("No valid isochrones found for any person")
+
+        overlap = _polygonal_part(shapely.intersection_all(list(isochrones)) if len(isochrones) > 1 else isochrones[0])
+        if overlap.is_empty:
+            logger.info("Isochrones do not overlap")
+            return MeetingArea(overlap=overlap, center=(np.nan, np.nan), radius_m=0.0)
+
+        center, radius_m = self.search_circle(overlap)
+        return MeetingArea(
+            overlap=overlap,
+            center=center,
+            radius_m=radius_m,
+            postcodes=self.postcodes_in(overlap),
+            venues=Venues.empty() if venue_kinds is None else self.venues_in(overlap, venue_kinds),
+        )
+
+    def postcodes_in(self, area: BaseGeometry) -> CandidateCells:
+        if self.postcode_index is None:
+            return CandidateCells.empty()
+        positions = self.postcode_index.query(area)
+        ids = positions if self.postcode_index.ids is None else self.postcode_index.ids[positions]
+        return CandidateCells(self.postcode_index.coords[positions], ids)
+
+    def venues_in(self, area: BaseGeometry, kinds: list[str] | None = None) -> Venues:
+        if self.venue_index is None:
+            return Venues.empty()
+        return self.venue_index.venues_in(area, kinds)
+
+    @staticmethod
+    def map_layers(
+        area: MeetingArea, isochrones: Sequence[BaseGeometry], max_postcodes: int = 50
+    ) -> dict[str, list[BaseGeometry]]:
+        """
+        The geometries a map of the meeting area draws, as layers for ``encode_topology``.
+
+        Args:
+            area: Result of ``find_meeting_area``
+            isochrones: The isochrones it was found from
+            max_postcodes: Number of postcode markers to include
+
+        """
+        return {
+            "isochrones": list(isochrones),
+            "overlap": [area.overlap],
+            "postcodes": [shapely.multipoints(area.postcodes.coords[:max_postcodes])],
+        }
+
+    @staticmethod
+    def search_circle(area: BaseGeometry) -> tuple[tuple[float, float], float]:
+        """
+        A centre inside ``area`` and the radius in metres that reaches its furthest vertex.
+
+        The centroid is used unless the area is concave enough for it to fall outside, in
+        which case a representative point is used instead.
+        """
+        center = area.centroid
+        if not area.contains(center):
+            center = area.representative_point()
+        vertices = shapely.get_coordinates(area)
+        radius_m = float(distance_matrix_m(np.array([[center.x, center.y]]), vertices).max())
+        return (center.x, center.y), radius_m
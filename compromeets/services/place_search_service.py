@@ -1,2 +1,162 @@
 # Calls GooglePlacesClient to search for places nearby a location
 # Handles multi-centre search, pagination/retries/backoff, deduping + canonicalisation, and rankings
+import logging
+import re
+import unicodedata
+from collections.abc import Sequence
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.clients.google_places_client import GooglePlacesClient
+from compromeets.data.venue_index import VenueIndex
+from compromeets.models.domain import UNKNOWN_KIND, VENUE_KINDS, Venues
+from compromeets.services.meeting_area_service import MeetingAreaService
+from compromeets.services.travel_time_service import distance_matrix_m
+
+logger = logging.getLogger(__name__)
+
+# A Places result is only matched to a local venue with the same name within this distance
+_MATCH_RADIUS_M = 75.0
+_MAX_PLACES_RESULTS = 20
+_MAX_PLACES_RADIUS_M = 50_000.0
+
+
+def normalise_name(name: str) -> str:
+    """
+    Reduce a venue name to a form that OSM and Google spellings of the same place share.
+
+    Accents, case, punctuation, "&" versus "and" and a leading "The" are ignored, so
+    "The Lamb & Flag" and "Lamb and Flag" match but "The Lamb" and "Lamb and Flag" do not.
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = re.sub(r"[^a-z0-9]+", " ", ascii_name.lower().replace("&", " and ")).split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    return " ".join(words)
+
+
+def _by_rating(venues: Venues) -> Venues:
+    """Venues sorted best rated first, unrated last, keeping the existing order among ties."""
+    return venues.take(np.argsort(-np.nan_to_num(venues.ratings, nan=-np.inf), kind="stable"))
+
+
+class PlaceSearchService:
+    """
+    Venue search that prefers the local OSM venue index over Google Places.
+
+    Candidate areas are filtered and ranked offline from the local index; Google is only
+    called once per search, to enrich the final shortlist with ratings.
+    """
+
+    def __init__(self, venue_index: VenueIndex | None = None, places_client: GooglePlacesClient | None = None):
+        if venue_index is None and places_client is None:
+            raise ValueError("A venue index or a Google Places client must be provided")
+        self.venue_index = venue_index
+        self.places_client = places_client
+
+    def local_venues(self, area: BaseGeometry, kinds: list[str] | None = None) -> Venues:
+        """Venues in ``area`` from the local index, without any network calls."""
+        if self.venue_index is None:
+            return Venues.empty()
+        return self.venue_index.venues_in(area, kinds)
+
+    def count_venues(self, areas: Sequence[BaseGeometry], kinds: list[str] | None = None) -> np.ndarray:
+        """Number of local venues in each area, for ranking and pruning candidate areas offline."""
+        if self.venue_index is None:
+            raise ValueError("Counting venues requires a venue index")
+        return np.array([len(self.venue_index.query(area, kinds)) for area in areas], dtype=np.int64)
+
+    def search(self, area: BaseGeometry, kinds: list[str], shortlist_size: int = 10) -> Venues:
+        """
+        Find venues in ``area``, best rated first.
+
+        Local venues closest to the centre of the area are shortlisted and enriched with Google
+        ratings. Without a local index, falls back to a Places radius search around the area.
+
+        Args:
+            area: Meeting area polygon in (lon, lat)
+            kinds: Venue kinds to search for, from ``VENUE_KINDS``
+            shortlist_size: Number of local venues to enrich
+
+        """
+        if self.venue_index is None:
+            return self._radius_search(area, kinds)
+
+        venues = self.local_venues(area, kinds)
+        if len(venues) == 0:
+            return venues
+        center, _ = MeetingAreaService.search_circle(area)
+        distances = distance_matrix_m(np.array([center]), venues.coords)[0]
+        # Unnamed venues are hard to match or present, so rank them after named ones
+        order = np.lexsort((distances, venues.names == ""))
+        return self.enrich(venues.take(order[:shortlist_size]))
+
+    def enrich(self, venues: Venues) -> Venues:
+        """
+        Add Google ratings to ``venues`` with a single Places request covering all of them.
+
+        The request asks for the places nearest the shortlist's centre rather than Google's
+        most popular, since the shortlist is itself the venues nearest the area's centre. A
+        result only rates a venue with the same normalised name within ``_MATCH_RADIUS_M``, so
+        a neighbour's rating is never attached to the wrong venue; unmatched and unnamed
+        venues stay unrated.
+
+        Returns:
+            The venues sorted by rating (unrated last); unchanged if there is no client
+
+        """
+        if self.places_client is None or len(venues) == 0:
+            return venues
+
+        center = venues.coords.mean(axis=0)
+        radius = min(
+            float(distance_matrix_m(center[None, :], venues.coords).max()) + _MATCH_RADIUS_M, _MAX_PLACES_RADIUS_M
+        )
+        response = self.places_client.search_nearby(
+            {"latitude": float(center[1]), "longitude": float(center[0])},
+            radius,
+            sorted(set(venues.kind_names()) - {""}),
+            max_result_count=_MAX_PLACES_RESULTS,
+            rank_preference="DISTANCE",
+        )
+
+        ratings = venues.ratings.copy()
+        rating_counts = venues.rating_counts.copy()
+        names = np.array([normalise_name(str(name)) for name in venues.names])
+        places = [p for p in response.get("places", []) if "location" in p]
+        matched = 0
+        if places:
+            place_coords = np.array([[p["location"]["longitude"], p["location"]["latitude"]] for p in places])
+            distances = distance_matrix_m(place_coords, venues.coords)
+            for place, venue_distances in zip(places, distances, strict=True):
+                name = normalise_name(place.get("displayName", {}).get("text", ""))
+                candidates = (names == name) & (names != "") & (venue_distances <= _MATCH_RADIUS_M)
+                candidates &= np.isnan(ratings)
+                if candidates.any():
+                    nearest = int(np.where(candidates, venue_distances, np.inf).argmin())
+                    ratings[nearest] = place.get("rating", np.nan)
+                    rating_counts[nearest] = place.get("userRatingCount", -1)
+                    matched += 1
+        log = logger.info if 2 * matched >= len(venues) else logger.warning
+        log("Matched %d of %d shortlisted venues to Places results by name", matched, len(venues))
+        return _by_rating(venues.with_ratings(ratings, rating_counts))
+
+    def _radius_search(self, area: BaseGeometry, kinds: list[str]) -> Venues:
+        if self.places_client is None:
+            return Venues.empty()
+        (lon, lat), radius = MeetingAreaService.search_circle(area)
+        response = self.places_client.search_nearby({"latitude": lat, "longitude": lon}, radius, kinds)
+        places = [p for p in response.get("places", []) if "location" in p]
+        if not places:
+            return Venues.empty()
+        kind = VENUE_KINDS.index(kinds[0]) if len(kinds) == 1 and kinds[0] in VENUE_KINDS else UNKNOWN_KIND
+        venues = Venues(
+            coords=[[p["location"]["longitude"], p["location"]["latitude"]] for p in places],
+            kinds=np.full(len(places), kind),
+            names=[p.get("displayName", {}).get("text", "") for p in places],
+            osm_ids=np.zeros(len(places)),
+            ratings=[p.get("rating", np.nan) for p in places],
+            rating_counts=[p.get("userRatingCount", -1) for p in places],
+        )
+        return _by_rating(venues)
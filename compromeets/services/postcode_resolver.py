@@ -1 +1,67 @@
 # Service for postcode location lookups
+import functools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from compromeets.data.spatial_index import PointIndex
+
+# ONSPD marks postcodes without a grid reference with this latitude
+_ONSPD_MISSING_LAT = 99.999999
+
+
+class PostcodeResolver:
+    """Postcode -> (lon, lat) lookups and point-in-area queries over the ONS postcode directory."""
+
+    def __init__(self, postcodes: np.ndarray, coords: np.ndarray):
+        """
+        Initialize the resolver.
+
+        Args:
+            postcodes: Length-n array of postcodes in ``pcds`` format (e.g. "E14 2DF")
+            coords: (n, 2) array of (lon, lat)
+
+        """
+        self.postcodes = np.asarray(postcodes)
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self._positions = {postcode: i for i, postcode in enumerate(self.postcodes)}
+
+    @classmethod
+    def from_onspd(cls, csv_path: Path | str) -> "PostcodeResolver":
+        """Load the ONSPD CSV, keeping only postcodes with a location."""
+        df = pd.read_csv(csv_path, usecols=["pcds", "lat", "long"]).dropna()
+        df = df[df["lat"] < _ONSPD_MISSING_LAT]
+        return cls(df["pcds"].to_numpy(), df[["long", "lat"]].to_numpy(dtype=np.float64))
+
+    def resolve(self, postcode: str) -> tuple[float, float]:
+        """
+        Look up a postcode's location.
+
+        Returns:
+            (lon, lat)
+
+        Raises:
+            KeyError: If the postcode is unknown
+
+        """
+        position = self._positions.get(self._normalise(postcode))
+        if position is None:
+            raise KeyError(f"Unknown postcode: {postcode}")
+        lon, lat = self.coords[position]
+        return float(lon), float(lat)
+
+    def resolve_many(self, postcodes: list[str]) -> np.ndarray:
+        """Look up several postcodes, returning an (n, 2) array of (lon, lat)."""
+        return np.array([self.resolve(postcode) for postcode in postcodes], dtype=np.float64).reshape(-1, 2)
+
+    @functools.cached_property
+    def index(self) -> PointIndex:
+        """Spatial index over every postcode, built on first use and kept for the resolver's lifetime."""
+        return PointIndex(self.coords, ids=self.postcodes)
+
+    @staticmethod
+    def _normalise(postcode: str) -> str:
+        """Format a postcode as ONSPD's ``pcds`` column does: upper case, single space before the inward code."""
+        compact = "".join(postcode.split()).upper()
+        return f"{compact[:-3]} {compact[-3:]}"
@@ -0,0 +1,295 @@
+# Long-lived worker that owns the transport network and micro-batches routing requests
+import datetime
+import functools
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from compromeets.models.domain import DEFAULT_TRANSPORT_MODES
+from compromeets.services.isochrone_service import isochrone_grid, isochrones_from_times, reach_speed_kmh
+from compromeets.services.travel_time_service import route_travel_times
+
+if TYPE_CHECKING:
+    import r5py
+
+logger = logging.getLogger(__name__)
+
+# (origins, destinations, departure, *, transport_modes, max_time_minutes) -> (n, m) minutes
+Router = Callable[..., np.ndarray]
+
+_STOP = object()
+
+
+@dataclass
+class _Request:
+    origins: np.ndarray
+    destinations: np.ndarray
+    departure: datetime.datetime
+    transport_modes: tuple[str, ...]
+    cutoffs: tuple[float, ...] = ()  # set for isochrone requests only
+    resolution_m: float = 0.0
+    future: Future = field(default_factory=Future)
+
+    @property
+    def settings(self) -> tuple[datetime.datetime, tuple[str, ...]]:
+        return self.departure, self.transport_modes
+
+    @property
+    def group_key(self) -> tuple[bool, datetime.datetime, tuple[str, ...]]:
+        # Isochrones are batched apart from matrices so their search can stop at the cutoff
+        return bool(self.cutoffs), self.departure, self.transport_modes
+
+
+class RoutingWorker:
+    """
+    Background thread that coalesces routing requests into batched r5py calls.
+
+    Requests arriving within ``batch_window_s`` of each other that share a departure time and
+    transport modes are merged into one ``TravelTimeMatrix`` over the union of their origins
+    and destinations. Isochrones are routed the same way, to a lattice grid around each
+    origin; nearby origins share lattice points, so a batch of isochrones routes to about one
+    grid. Isochrone and travel time requests are batched separately so isochrone searches
+    stop at the largest cutoff. Each caller gets a ``Future`` for its own slice of the result.
+
+    The union is a cross product, so every request pays for the others' destinations. Requests
+    are only merged when their destinations' bounding boxes overlap and the merged matrix stays
+    within ``max_batch_cells``; anything else is routed in a separate call.
+    """
+
+    def __init__(
+        self,
+        transport_network: "r5py.TransportNetwork | None" = None,
+        *,
+        router: Router | None = None,
+        batch_window_s: float = 0.01,
+        max_batch_size: int = 64,
+        max_batch_cells: int = 4_000_000,
+    ):
+        """
+        Initialize the worker; call ``start`` (or use it as a context manager) before submitting.
+
+        Args:
+            transport_network: Network to route on
+            router: Replacement for r5py routing, mainly for tests
+            batch_window_s: How long to wait for more requests after the first one arrives
+            max_batch_size: Maximum requests coalesced into one window
+            max_batch_cells: Largest origins x destinations matrix requests are merged into; a
+                single request larger than this is still routed, on its own
+
+        """
+        if router is None:
+            if transport_network is None:
+                raise ValueError("A transport network or router must be provided")
+            router = functools.partial(route_travel_times, transport_network)
+        self.router = router
+        self.batch_window_s = batch_window_s
+        self.max_batch_size = max_batch_size
+        self.max_batch_cells = max_batch_cells
+        self.stats = {"requests": 0, "router_calls": 0}
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="routing-worker", daemon=True)
+        self._stopped = False
+
+    def start(self) -> "RoutingWorker":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Finish queued requests, then stop the worker thread."""
+        if not self._stopped:
+            self._stopped = True
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def submit_travel_times(
+        self,
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        departure: datetime.datetime,
+        transport_modes: Sequence[str] = DEFAULT_TRANSPORT_MODES,
+    ) -> "Future[np.ndarray]":
+        """
+        Queue a travel time matrix request.
+
+        Args:
+            origins: (n, 2) array of (lon, lat)
+            destinations: (m, 2) array of (lon, lat)
+            departure: Departure time
+            transport_modes: ``r5py.TransportMode`` names
+
+        Returns:
+            Future resolving to an (n, m) array of minutes, ``nan`` where unreachable
+
+        """
+        return self._submit(
+            _Request(
+                origins=np.asarray(origins, dtype=np.float64).reshape(-1, 2),
+                destinations=np.asarray(destinations, dtype=np.float64).reshape(-1, 2),
+                departure=departure,
+                transport_modes=tuple(transport_modes),
+            )
+        )
+
+    def submit_isochrones(
+        self,
+        origin: tuple[float, float],
+        cutoffs: Sequence[float],
+        departure: datetime.datetime,
+        transport_modes: Sequence[str] = DEFAULT_TRANSPORT_MODES,
+        resolution_m: float = 200.0,
+    ) -> "Future[list[BaseGeometry]]":
+        """
+        Queue an isochrone request.
+
+        Args:
+            origin: (lon, lat)
+            cutoffs: Isochrone cutoffs in minutes
+            departure: Departure time
+            transport_modes: ``r5py.TransportMode`` names
+            resolution_m: Spacing of the destination grid, which extends as far as the modes can
+                plausibly reach (``REACH_SPEED_KMH``)
+
+        Returns:
+            Future resolving to one (Multi)Polygon per cutoff
+
+        """
+        return self._submit(
+            _Request(
+                origins=np.array([origin], dtype=np.float64),
+                destinations=isochrone_grid(origin, max(cutoffs), resolution_m, reach_speed_kmh(transport_modes)),
+                departure=departure,
+                transport_modes=tuple(transport_modes),
+                cutoffs=tuple(cutoffs),
+                resolution_m=resolution_m,
+            )
+        )
+
+    def _submit(self, request: _Request) -> Future:
+        if self._stopped:
+            raise RuntimeError("Routing worker has been stopped")
+        self._queue.put(request)
+        return request.future
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            groups: dict[tuple, list[_Request]] = defaultdict(list)
+            for request in batch:
+                if request.future.set_running_or_notify_cancel():
+                    groups[request.group_key].append(request)
+            for requests in groups.values():
+                for merged in self._partition(requests):
+                    self._run_group(merged)
+
+    def _partition(self, requests: list[_Request]) -> list[list[_Request]]:
+        """
+        Split compatible requests into batches worth merging.
+
+        Requests are taken west to east and each joins the first batch whose destinations'
+        bounding box it overlaps, if the batch's matrix (counted without deduplication, so an
+        upper bound) stays within ``max_batch_cells``; otherwise it starts a new batch.
+        """
+        batches: list[list[_Request]] = []
+        bounds: list[np.ndarray] = []
+        sizes: list[tuple[int, int]] = []
+        for request in sorted(requests, key=lambda r: tuple(r.destinations[:1].sum(axis=0))):
+            if len(request.destinations) == 0:
+                batches.append([request])
+                bounds.append(np.full(4, np.nan))  # overlaps nothing
+                sizes.append((len(request.origins), 0))
+                continue
+            box = np.concatenate([request.destinations.min(axis=0), request.destinations.max(axis=0)])
+            n, m = len(request.origins), len(request.destinations)
+            for i, (batch_box, (batch_n, batch_m)) in enumerate(zip(bounds, sizes, strict=True)):
+                overlaps = bool((box[:2] <= batch_box[2:]).all() and (batch_box[:2] <= box[2:]).all())
+                if overlaps and (batch_n + n) * (batch_m + m) <= self.max_batch_cells:
+                    batches[i].append(request)
+                    bounds[i] = np.concatenate([np.minimum(box[:2], batch_box[:2]), np.maximum(box[2:], batch_box[2:])])
+                    sizes[i] = (batch_n + n, batch_m + m)
+                    break
+            else:
+                batches.append([request])
+                bounds.append(box)
+                sizes.append((n, m))
+        return batches
+
+    def _run_group(self, requests: list[_Request]) -> None:
+        """Route a group of compatible requests with a single router call and fan the results out."""
+        self.stats["requests"] += len(requests)
+        self.stats["router_calls"] += 1
+        try:
+            # Deduplicate so shared origins (e.g. the same person in several requests) are routed once
+            unique_origins, origin_index = np.unique(
+                np.concatenate([r.origins for r in requests]), axis=0, return_inverse=True
+            )
+            unique_destinations, destination_index = np.unique(
+                np.concatenate([r.destinations for r in requests]), axis=0, return_inverse=True
+            )
+            # Isochrone batches can stop searching at the largest cutoff
+            max_time = max(max(r.cutoffs) for r in requests) if requests[0].cutoffs else None
+            departure, transport_modes = requests[0].settings
+            logger.debug("Routing %d requests as %dx%d", len(requests), len(unique_origins), len(unique_destinations))
+            times = self.router(
+                unique_origins,
+                unique_destinations,
+                departure,
+                transport_modes=transport_modes,
+                max_time_minutes=max_time,
+            )
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        origin_offsets = itertools.accumulate((len(r.origins) for r in requests), initial=0)
+        destination_offsets = itertools.accumulate((len(r.destinations) for r in requests), initial=0)
+        for request, o_start, d_start in zip(requests, origin_offsets, destination_offsets, strict=False):
+            rows = origin_index.ravel()[o_start : o_start + len(request.origins)]
+            cols = destination_index.ravel()[d_start : d_start + len(request.destinations)]
+            block = times[np.ix_(rows, cols)]
+            try:
+                if request.cutoffs:
+                    result = isochrones_from_times(
+                        request.destinations, block[0], request.cutoffs, request.resolution_m
+                    )
+                else:
+                    result = block
+            except Exception as e:
+                request.future.set_exception(e)
+            else:
+                request.future.set_result(result)
+
+    def __enter__(self) -> "RoutingWorker":
+        return self.start()
+
+    def __exit__(
+        self, exc_type: BaseException | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self.stop()
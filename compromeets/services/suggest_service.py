@@ -1 +1,195 @@
 # Orchestrates end to end location finding process
+import logging
+import math
+import os
+import uuid
+from dataclasses import replace
+from pathlib import Path
+from types import TracebackType
+
+import numpy as np
+import shapely
+
+from compromeets.config import ARTIFACTS_DIR, ONSPD_CSV
+from compromeets.models.domain import CandidateCells, Group, Venues
+from compromeets.models.inputs import SuggestRequest, SuggestResponse, VenueSuggestion
+from compromeets.services.meeting_area_service import MeetingAreaService
+from compromeets.services.place_search_service import PlaceSearchService
+from compromeets.services.postcode_resolver import PostcodeResolver
+from compromeets.services.routing_worker import RoutingWorker
+from compromeets.services.topology_encoder import TopologyCache
+from compromeets.services.travel_time_service import TravelTimeService
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_POSTCODES = 50
+# Isochrone grids grow with the square of the budget, so longer budgets are clamped
+MAX_BUDGET_MINUTES = 120
+
+
+class SuggestService:
+    """Postcodes in, venues out: budget, isochrones, overlap and venue search in one call."""
+
+    def __init__(
+        self,
+        resolver: PostcodeResolver,
+        travel_time_service: TravelTimeService,
+        routing_worker: RoutingWorker,
+        meeting_area_service: MeetingAreaService,
+        place_search_service: PlaceSearchService | None = None,
+        *,
+        map_cache: TopologyCache | None = None,
+        max_budget_minutes: int = MAX_BUDGET_MINUTES,
+    ):
+        self.resolver = resolver
+        self.travel_time_service = travel_time_service
+        self.routing_worker = routing_worker
+        self.meeting_area_service = meeting_area_service
+        self.place_search_service = place_search_service
+        self.map_cache = map_cache if map_cache is not None else TopologyCache()
+        self.max_budget_minutes = max_budget_minutes
+
+    @classmethod
+    def from_artifacts(
+        cls, artifacts_dir: Path | str = ARTIFACTS_DIR, onspd_csv: Path | str = ONSPD_CSV
+    ) -> "SuggestService":
+        """
+        Load everything the service needs from the artifacts tree built by the ingestion pipeline.
+
+        The travel time table, venue index and Google Places key are used if present. This
+        loads the transport network and starts the JVM, so it takes a while; the daemon keeps
+        the result warm between queries.
+
+        Raises:
+            FileNotFoundError: If the OSM extract or postcode directory is missing
+
+        """
+        from compromeets.clients.google_places_client import GooglePlacesClient
+        from compromeets.data.stages import existing_gtfs_feeds, latest_osm_extract
+        from compromeets.data.travel_time_table import TravelTimeTable
+        from compromeets.data.venue_index import VenueIndex
+        from compromeets.services.transport_network_provider import get_transport_network
+        from compromeets.services.travel_time_service import TravelTimeEstimator
+
+        artifacts_dir = Path(artifacts_dir)
+        osm_pbf = latest_osm_extract(artifacts_dir)
+        if osm_pbf is None:
+            raise FileNotFoundError(f"No .osm.pbf extract found in {artifacts_dir}")
+        if not Path(onspd_csv).exists():
+            raise FileNotFoundError(f"ONSPD CSV not found at {onspd_csv} (set COMPROMEETS_ONSPD_CSV)")
+
+        resolver = PostcodeResolver.from_onspd(onspd_csv)
+        routing_worker = RoutingWorker(get_transport_network(osm_pbf, existing_gtfs_feeds(artifacts_dir))).start()
+
+        table_dir = artifacts_dir / "travel_time_table"
+        estimator = TravelTimeEstimator(TravelTimeTable.load(table_dir)) if (table_dir / "meta.json").exists() else None
+
+        venues_path = artifacts_dir / "venues.npz"
+        venue_index = VenueIndex.load(venues_path) if venues_path.exists() else None
+        places_client = GooglePlacesClient() if os.getenv("GOOGLE_PLACES_API_KEY") else None
+        place_search = (
+            PlaceSearchService(venue_index=venue_index, places_client=places_client)
+            if venue_index is not None or places_client is not None
+            else None
+        )
+
+        return cls(
+            resolver=resolver,
+            travel_time_service=TravelTimeService(estimator=estimator, routing_worker=routing_worker),
+            routing_worker=routing_worker,
+            meeting_area_service=MeetingAreaService(postcode_index=resolver.index, venue_index=venue_index),
+            place_search_service=place_search,
+        )
+
+    def suggest(self, request: SuggestRequest) -> SuggestResponse:
+        """
+        Suggest venues everyone in the request can reach.
+
+        Raises:
+            KeyError: If a postcode is unknown
+            ValueError: If the origins cannot reach each other
+
+        """
+        group = request.to_group(self.resolver.resolve_many(request.postcodes))
+        coords = group.origins.coords
+
+        longest = self.travel_time_service.max_pairwise_travel_time(
+            coords, group.departure, transport_modes=group.transport_modes
+        )
+        if not math.isfinite(longest):
+            raise ValueError("No route found between some of the postcodes")
+        budget = max(1, round(longest * group.budget_ratio))
+        if budget > self.max_budget_minutes:
+            logger.warning("Clamping isochrone budget of %d minutes to %d", budget, self.max_budget_minutes)
+            budget = self.max_budget_minutes
+        logger.info("Isochrone budget %d minutes (longest trip %.0f)", budget, longest)
+
+        # Submitted together so the worker routes every person's isochrone in one batch
+        futures = [
+            self.routing_worker.submit_isochrones(tuple(origin), [budget], group.departure, group.transport_modes)
+            for origin in coords
+        ]
+        isochrones = [future.result()[0] for future in futures]
+        area = self.meeting_area_service.find_meeting_area(isochrones)
+
+        venues = Venues.empty()
+        if self.place_search_service is not None and not area.overlap.is_empty:
+            venues = self.place_search_service.search(area.overlap, list(request.venue_kinds))
+        postcodes, venues = self._with_travel_times(group, area.postcodes, venues)
+        # Fairest postcodes first, so the sample and the map markers show the best of the overlap
+        area = replace(area, postcodes=postcodes.take(np.argsort(postcodes.longest_trips(), kind="stable")))
+
+        request_id = uuid.uuid4().hex
+        self.map_cache.put(request_id, MeetingAreaService.map_layers(area, isochrones, _SAMPLE_POSTCODES))
+
+        # With a zoom the overlap goes out in the compact map instead of at full resolution
+        full_overlap = None if area.overlap.is_empty or request.zoom is not None else area.overlap
+        has_center = not np.isnan(area.center[0])
+        return SuggestResponse(
+            request_id=request_id,
+            budget_minutes=budget,
+            center_latitude=area.center[1] if has_center else None,
+            center_longitude=area.center[0] if has_center else None,
+            radius_m=area.radius_m,
+            postcodes_in_overlap=len(area.postcodes),
+            sample_postcodes=[str(p) for p in area.postcodes.ids[:_SAMPLE_POSTCODES]],
+            venues=VenueSuggestion.from_venues(venues),
+            overlap=None if full_overlap is None else shapely.geometry.mapping(full_overlap),
+            map=None if request.zoom is None else self.map(request_id, request.zoom),
+        )
+
+    def _with_travel_times(
+        self, group: Group, postcodes: CandidateCells, venues: Venues
+    ) -> tuple[CandidateCells, Venues]:
+        """Attach everyone's travel times to the candidate postcodes and venues, in one matrix."""
+        destinations = np.concatenate([postcodes.coords, venues.coords])
+        if len(destinations) == 0:
+            return postcodes, venues
+        times = self.travel_time_service.travel_time_matrix(
+            group.origins.coords, destinations, group.departure, transport_modes=group.transport_modes
+        )
+        split = len(postcodes)
+        return postcodes.with_travel_times(times[:, :split]), venues.with_travel_times(times[:, split:])
+
+    def map(self, request_id: str, zoom: int) -> dict:
+        """
+        TopoJSON of a previous suggestion's isochrones, overlap and postcodes for ``zoom``.
+
+        Raises:
+            KeyError: If the request id is unknown or has been evicted from the cache
+
+        """
+        return self.map_cache.get(request_id, zoom)
+
+    def close(self) -> None:
+        self.routing_worker.stop()
+        if self.place_search_service is not None and self.place_search_service.places_client is not None:
+            self.place_search_service.places_client.close()
+
+    def __enter__(self) -> "SuggestService":
+        return self
+
+    def __exit__(
+        self, exc_type: BaseException | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self.close()
@@ -0,0 +1,360 @@
+"""
+Encode map layers as quantised TopoJSON simplified for a web map zoom level.
+
+Isochrones and their overlap share most of their boundaries, since the overlap is cut from
+the isochrones. TopoJSON stores each shared boundary once as an arc that the polygons
+reference, and simplifying the arcs (not the polygons) keeps shared edges identical at
+every tolerance, so no slivers or gaps open up between layers. Coordinates are quantised
+to half a screen pixel at the requested zoom and arcs are delta-encoded, which is where
+most of the size reduction comes from.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+TILE_SIZE = 256
+MAX_ZOOM = 22
+
+_POLYGONAL = ("Polygon", "MultiPolygon")
+_PUNTAL = ("Point", "MultiPoint")
+_MIN_RING = 4  # closed ring: three distinct points and the repeated first
+_MIN_TO_NODE = 2
+_NODE_TOLERANCE = 1e-7  # degrees, about 1cm; vertices of an overlay lie on the input edges to float precision
+
+Point = tuple[int, int]
+Layers = Mapping[str, Sequence[BaseGeometry]]
+
+
+def pixel_size(zoom: float, latitude: float) -> tuple[float, float]:
+    """
+    Size of one screen pixel in degrees of (lon, lat) on a Web Mercator map.
+
+    Args:
+        zoom: Map zoom level; 0 fits the world in one 256px tile
+        latitude: Latitude the pixel is at
+
+    """
+    lon_degrees = 360.0 / (TILE_SIZE * 2.0**zoom)
+    return lon_degrees, lon_degrees * math.cos(math.radians(latitude))
+
+
+def encode_topology(layers: Layers, zoom: float, tolerance_px: float = 1.0, min_area_px: float = 4.0) -> dict:
+    """
+    Encode layers of geometries as TopoJSON simplified for ``zoom``.
+
+    Polygons are split into arcs at the points where boundaries of different rings meet;
+    each distinct arc is stored once, simplified with Douglas-Peucker at ``tolerance_px``
+    and delta-encoded on a half-pixel integer grid. Rings covering less than
+    ``min_area_px`` or that simplify away are dropped, so specks and pinholes that would
+    not be visible at this zoom cost nothing. Points are quantised but not simplified.
+
+    Snapping to the grid can make a jagged ring touch itself at a corner; that draws
+    correctly but is not OGC-valid, so run ``shapely.make_valid`` on decoded polygons
+    before using them in overlays.
+
+    Args:
+        layers: Named sequences of (Multi)Polygons and (Multi)Points in (lon, lat), e.g.
+            ``{"isochrones": isochrones, "overlap": [area.overlap]}``
+        zoom: Web map zoom level the output will be displayed at
+        tolerance_px: Simplification tolerance in screen pixels
+        min_area_px: Smallest ring to keep, in square screen pixels
+
+    Returns:
+        A TopoJSON ``Topology`` with one ``GeometryCollection`` object per layer
+
+    Raises:
+        ValueError: If a non-empty geometry is neither polygonal nor points
+
+    """
+    for name, layer in layers.items():
+        for geometry in layer:
+            if not geometry.is_empty and geometry.geom_type not in _POLYGONAL + _PUNTAL:
+                raise ValueError(f"Cannot encode {geometry.geom_type} in layer {name!r}")
+
+    non_empty = [geometry for layer in layers.values() for geometry in layer if not geometry.is_empty]
+    bounds = shapely.total_bounds(non_empty) if non_empty else np.zeros(4)
+    pixel = pixel_size(zoom, (bounds[1] + bounds[3]) / 2)
+    scale = (pixel[0] / 2, pixel[1] / 2)
+    translate = (float(bounds[0]), float(bounds[1]))
+    min_area = min_area_px * 4  # four grid cells per square pixel
+
+    parts = {
+        name: [shapely.get_parts(g) if g.geom_type in _POLYGONAL else None for g in layer]
+        for name, layer in layers.items()
+    }
+    polygons = [part for layer in parts.values() for geometry in layer if geometry is not None for part in geometry]
+    noded = iter(_node(np.array(polygons, dtype=object), _NODE_TOLERANCE))
+
+    builder = _ArcBuilder()
+    encoded: dict[str, list] = {}
+    for name, layer in layers.items():
+        encoded[name] = []
+        for geometry, geometry_parts in zip(layer, parts[name], strict=True):
+            if geometry_parts is None:
+                encoded[name].append(_encode_points(geometry, translate, scale))
+                continue
+            handles = []
+            for _ in geometry_parts:
+                rings = [_quantise(ring, translate, scale) for ring in _rings(next(noded))]
+                handles.append(
+                    [
+                        builder.add_ring(ring) if len(ring) >= _MIN_RING and _area(ring) >= min_area else None
+                        for ring in rings
+                    ]
+                )
+            encoded[name].append(handles)
+
+    arcs = builder.simplified_arcs(tolerance_px * 2)  # two grid steps per pixel
+    objects = {
+        name: {
+            "type": "GeometryCollection",
+            "geometries": [item if isinstance(item, dict) else builder.polygon_object(item) for item in items],
+        }
+        for name, items in encoded.items()
+    }
+    return {
+        "type": "Topology",
+        "bbox": [float(b) for b in bounds],
+        "transform": {"scale": list(scale), "translate": list(translate)},
+        "objects": objects,
+        "arcs": [np.concatenate([arc[:1], np.diff(arc, axis=0)]).tolist() for arc in arcs],
+    }
+
+
+def decode_topology(topology: dict, name: str) -> list[BaseGeometry]:
+    """
+    Rebuild shapely geometries from one object of a topology made by ``encode_topology``.
+
+    Raises:
+        KeyError: If the topology has no object called ``name``
+
+    """
+    scale = np.array(topology["transform"]["scale"])
+    translate = np.array(topology["transform"]["translate"])
+    arcs = [np.cumsum(np.array(arc, dtype=np.int64), axis=0) for arc in topology["arcs"]]
+
+    def ring(refs: list[int]) -> np.ndarray:
+        parts = [arcs[ref] if ref >= 0 else arcs[~ref][::-1] for ref in refs]
+        points = np.concatenate([parts[0], *(part[1:] for part in parts[1:])])
+        return points * scale + translate
+
+    def polygon(rings: list[list[int]]) -> shapely.Polygon:
+        return shapely.Polygon(ring(rings[0]), [ring(hole) for hole in rings[1:]])
+
+    geometries = []
+    for item in topology["objects"][name]["geometries"]:
+        kind = item["type"]
+        if kind is None:
+            geometries.append(shapely.Polygon())
+        elif kind == "Polygon":
+            geometries.append(polygon(item["arcs"]))
+        elif kind == "MultiPolygon":
+            geometries.append(shapely.MultiPolygon([polygon(rings) for rings in item["arcs"]]))
+        else:
+            coords = np.array(item["coordinates"], dtype=float).reshape(-1, 2) * scale + translate
+            geometries.append(shapely.points(coords[0]) if kind == "Point" else shapely.multipoints(coords))
+    return geometries
+
+
+class TopologyCache:
+    """
+    Geometries kept per request id, with their encoding memoised per zoom level.
+
+    A client that shows a suggestion and then zooms fetches the same request's layers at a
+    handful of zoom levels; each is encoded once. Least recently used requests are evicted
+    once more than ``maxsize`` requests or ``max_coordinates`` stored coordinates are held;
+    full-resolution isochrones vary a lot in size, so the coordinate count is what bounds
+    memory.
+    """
+
+    def __init__(self, maxsize: int = 128, max_coordinates: int = 2_000_000):
+        self.maxsize = maxsize
+        self.max_coordinates = max_coordinates
+        self._entries: OrderedDict[str, tuple[Layers, dict[int, dict]]] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._coordinates = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._entries
+
+    def put(self, request_id: str, layers: Layers) -> None:
+        size = sum(int(shapely.get_num_coordinates(list(layer)).sum()) for layer in layers.values())
+        with self._lock:
+            self._coordinates += size - self._sizes.get(request_id, 0)
+            self._entries[request_id] = (layers, {})
+            self._sizes[request_id] = size
+            self._entries.move_to_end(request_id)
+            # The newest entry is always kept, however large
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.maxsize or self._coordinates > self.max_coordinates
+            ):
+                evicted, _ = self._entries.popitem(last=False)
+                self._coordinates -= self._sizes.pop(evicted)
+
+    def get(self, request_id: str, zoom: int) -> dict:
+        """
+        The layers stored for ``request_id`` encoded for ``zoom``.
+
+        Raises:
+            KeyError: If the request id is unknown or has been evicted
+            ValueError: If ``zoom`` is outside 0 to ``MAX_ZOOM``
+
+        """
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}, got {zoom}")
+        with self._lock:
+            if request_id not in self._entries:
+                raise KeyError(f"Unknown request id: {request_id}")
+            self._entries.move_to_end(request_id)
+            layers, encoded = self._entries[request_id]
+            if zoom in encoded:
+                return encoded[zoom]
+        topology = encode_topology(layers, zoom)
+        with self._lock:
+            return encoded.setdefault(zoom, topology)
+
+
+class _ArcBuilder:
+    """Splits quantised rings into shared arcs and assigns each distinct arc an index."""
+
+    def __init__(self):
+        self.rings: list[list[Point]] = []
+        self.neighbours: dict[Point, set[Point]] = {}
+        self.junctions: set[Point] = set()
+        self.ring_arcs: list[list[int]] = []
+        self.arcs: list[np.ndarray] = []
+
+    def add_ring(self, grid: np.ndarray) -> int:
+        """Register a closed ring (first point repeated at the end) and return its handle."""
+        ring: list[Point] = list(map(tuple, grid.tolist()))
+        points = ring[:-1]
+        for i, point in enumerate(points):
+            pair = {points[i - 1], points[(i + 1) % len(points)]}
+            seen = self.neighbours.setdefault(point, pair)
+            # A point on a boundary shared by two rings has the same two neighbours in both;
+            # where the boundaries part the neighbours differ, and an arc must end there
+            if seen is not pair and seen != pair:
+                self.junctions.add(point)
+        self.rings.append(ring)
+        return len(self.rings) - 1
+
+    def simplified_arcs(self, tolerance: float) -> list[np.ndarray]:
+        """Cut every ring into arcs, store each distinct arc once, and simplify them; fills ``ring_arcs``."""
+        index: dict[tuple[Point, ...], int] = {}
+        arcs: list[list[Point]] = []
+        for ring in self.rings:
+            refs = []
+            for arc in self._cut(ring):
+                key, reverse = tuple(arc), tuple(reversed(arc))
+                if key in index:
+                    refs.append(index[key])
+                elif reverse in index:
+                    refs.append(~index[reverse])
+                else:
+                    index[key] = len(arcs)
+                    refs.append(len(arcs))
+                    arcs.append(arc)
+            self.ring_arcs.append(refs)
+
+        if not arcs:
+            return self.arcs
+        lines = shapely.linestrings(
+            np.concatenate(arcs), indices=np.repeat(np.arange(len(arcs)), [len(arc) for arc in arcs])
+        )
+        lines = shapely.simplify(lines, tolerance, preserve_topology=True)
+        self.arcs = [np.rint(shapely.get_coordinates(line)).astype(np.int64) for line in lines]
+        return self.arcs
+
+    def polygon_object(self, polygons: list[list[int | None]]) -> dict:
+        """TopoJSON geometry for one (Multi)Polygon given its ring handles, minus collapsed rings."""
+        kept = []
+        for handles in polygons:
+            rings = [h for h in handles if h is not None and self._ring_size(h) >= _MIN_RING]
+            if rings and rings[0] == handles[0]:  # a polygon whose exterior collapsed is dropped
+                kept.append([self.ring_arcs[h] for h in rings])
+        if not kept:
+            return {"type": None}
+        if len(kept) == 1:
+            return {"type": "Polygon", "arcs": kept[0]}
+        return {"type": "MultiPolygon", "arcs": kept}
+
+    def _ring_size(self, handle: int) -> int:
+        return 1 + sum(len(self.arcs[ref if ref >= 0 else ~ref]) - 1 for ref in self.ring_arcs[handle])
+
+    def _cut(self, ring: list[Point]) -> list[list[Point]]:
+        points = ring[:-1]
+        starts = [i for i, point in enumerate(points) if point in self.junctions]
+        if not starts:
+            # One closed arc, started at its smallest point so that identical rings give the
+            # same arc in either direction
+            first = min(range(len(points)), key=points.__getitem__)
+            rotated = points[first:] + points[:first]
+            return [[*rotated, rotated[0]]]
+        rotated = points[starts[0] :] + points[: starts[0]] + [points[starts[0]]]
+        cuts = [i - starts[0] for i in starts] + [len(points)]
+        return [rotated[a : b + 1] for a, b in zip(cuts, cuts[1:], strict=False)]
+
+
+def _node(polygons: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Insert a vertex wherever another polygon's vertex lies on a boundary.
+
+    An overlap's boundary switches from one isochrone's edge to another's at points that
+    are vertices of the overlap but of neither isochrone; without those vertices the shared
+    stretches could not be cut into common arcs.
+    """
+    if len(polygons) < _MIN_TO_NODE:
+        return polygons
+    coords = shapely.get_coordinates(polygons)
+    owners = np.repeat(np.arange(len(polygons)), shapely.get_num_coordinates(polygons))
+    tree = shapely.STRtree(shapely.points(coords))
+    parts, hits = tree.query(shapely.boundary(polygons), predicate="dwithin", distance=tolerance)
+    # Vertices a polygon already has need no snapping, and are most of the hits
+    own = set(zip(owners.tolist(), map(tuple, coords.tolist()), strict=True))
+    keep = [
+        (part, point) not in own for part, point in zip(parts.tolist(), map(tuple, coords[hits].tolist()), strict=True)
+    ]
+    parts, hits = parts[keep], hits[keep]
+
+    noded = polygons.copy()
+    for i in np.unique(parts):
+        points = hits[parts == i]
+        noded[i] = shapely.snap(polygons[i], shapely.multipoints(coords[points]), tolerance)
+    return noded
+
+
+def _rings(polygon: shapely.Polygon) -> list[np.ndarray]:
+    polygon = shapely.orient_polygons(polygon)
+    return [shapely.get_coordinates(polygon.exterior)] + [shapely.get_coordinates(r) for r in polygon.interiors]
+
+
+def _quantise(coords: np.ndarray, translate: tuple[float, float], scale: tuple[float, float]) -> np.ndarray:
+    grid = np.rint((coords - translate) / scale).astype(np.int64)
+    keep = np.ones(len(grid), dtype=bool)
+    keep[1:] = (grid[1:] != grid[:-1]).any(axis=1)
+    return grid[keep]
+
+
+def _area(ring: np.ndarray) -> float:
+    """Unsigned shoelace area of a closed ring."""
+    x, y = ring[:, 0], ring[:, 1]
+    return abs(float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))) / 2
+
+
+def _encode_points(geometry: BaseGeometry, translate: tuple[float, float], scale: tuple[float, float]) -> dict:
+    if geometry.is_empty:
+        return {"type": None}
+    coords = np.rint((shapely.get_coordinates(geometry) - translate) / scale).astype(np.int64).tolist()
+    if geometry.geom_type == "Point":
+        return {"type": "Point", "coordinates": coords[0]}
+    return {"type": "MultiPoint", "coordinates": coords}
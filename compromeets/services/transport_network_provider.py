@@ -1 +1,36 @@
-# Service for loading nad caching routing graphs from OSM and GTFS data
+# Service for loading and caching routing graphs from OSM and GTFS data
+import functools
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import r5py
+
+logger = logging.getLogger(__name__)
+
+
+def get_transport_network(osm_pbf: Path | str, gtfs: Sequence[Path | str] = ()) -> "r5py.TransportNetwork":
+    """
+    Load an r5py transport network, reusing one already built in this process.
+
+    r5py is imported here rather than at module level, as importing it starts the JVM.
+
+    Args:
+        osm_pbf: Path to the OSM .pbf extract
+        gtfs: Paths to GTFS .zip feeds
+
+    Returns:
+        The loaded transport network
+
+    """
+    return _load_transport_network(Path(osm_pbf).resolve(), tuple(Path(p).resolve() for p in gtfs))
+
+
+@functools.cache
+def _load_transport_network(osm_pbf: Path, gtfs: tuple[Path, ...]) -> "r5py.TransportNetwork":
+    import r5py
+
+    logger.info("Loading transport network from %s with %d GTFS feeds", osm_pbf, len(gtfs))
+    return r5py.TransportNetwork(osm_pbf=osm_pbf, gtfs=list(gtfs))
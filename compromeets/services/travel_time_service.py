@@ -1 +1,255 @@
 # Service for calculating travel times between locations based on r5py.TravelTimeMatrix
+import datetime
+import math
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from compromeets.data.travel_time_table import (
+    METRES_PER_DEGREE_LAT,
+    METRES_PER_DEGREE_LON,
+    TABLE_TRANSPORT_MODES,
+    UNREACHABLE,
+    TravelTimeTable,
+)
+from compromeets.models.domain import DEFAULT_TRANSPORT_MODES
+
+if TYPE_CHECKING:
+    import r5py
+
+    from compromeets.services.routing_worker import RoutingWorker
+
+
+def distance_matrix_m(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Approximate distances in metres between two sets of (lon, lat) points.
+
+    Uses an equirectangular projection, which is accurate to well under 1% at city scale.
+
+    Returns:
+        float64 array of shape (len(a), len(b))
+
+    """
+    lon_scale = METRES_PER_DEGREE_LON * math.cos(math.radians(float(np.concatenate([a[:, 1], b[:, 1]]).mean())))
+    dx = (a[:, None, 0] - b[None, :, 0]) * lon_scale
+    dy = (a[:, None, 1] - b[None, :, 1]) * METRES_PER_DEGREE_LAT
+    return np.hypot(dx, dy)
+
+
+class TravelTimeEstimator:
+    """
+    Approximate door-to-door travel times from a precomputed zone table.
+
+    Each point walks to its ``nearest_zones`` closest zones, rides zone-to-zone using the
+    table, then walks from the destination zone; the estimate is the best such combination,
+    or walking directly if that is quicker. Trips longer than the table's routing cut-off
+    count as unreachable, as they do in the table itself. No JVM is involved, so this is cheap enough
+    for budgeting and ranking, leaving exact r5py routing for the final candidates.
+    """
+
+    def __init__(self, table: TravelTimeTable, walk_speed_kmh: float = 3.6, nearest_zones: int = 4):
+        """
+        Initialize the estimator.
+
+        Args:
+            table: Loaded zone-to-zone table
+            walk_speed_kmh: Walking speed for access/egress legs (r5py's default is 3.6)
+            nearest_zones: Number of candidate zones considered at each end
+
+        """
+        self.table = table
+        self.walk_metres_per_minute = walk_speed_kmh * 1000 / 60
+        self.nearest_zones = min(nearest_zones, len(table.zones))
+
+    def estimate(self, origins: np.ndarray, destinations: np.ndarray, departure: datetime.datetime) -> np.ndarray:
+        """
+        Estimate travel times from every origin to every destination.
+
+        Args:
+            origins: (n, 2) array of (lon, lat)
+            destinations: (m, 2) array of (lon, lat)
+            departure: Departure time, mapped to the closest precomputed slot
+
+        Returns:
+            float32 array of shape (n, m) in minutes; ``inf`` where the best estimate is longer
+            than the table's ``max_time_minutes``
+
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        times = self.table.times[self.table.slot_for(departure)]
+
+        origin_zones, origin_walk = self._access(origins)
+        dest_zones, dest_walk = self._access(destinations)
+
+        # Gather only the (n, k, m, k) cells needed; on a memmap this touches just those pages
+        ride = times[origin_zones[:, :, None, None], dest_zones[None, None, :, :]].astype(np.float32)
+        ride[ride == UNREACHABLE] = np.inf
+        total = origin_walk[:, :, None, None] + ride + dest_walk[None, None, :, :]
+        via_transit = total.min(axis=(1, 3))
+
+        walk = (distance_matrix_m(origins, destinations) / self.walk_metres_per_minute).astype(np.float32)
+        estimate = np.minimum(via_transit, walk)
+        estimate[estimate > self.table.max_time_minutes] = np.inf
+        return estimate
+
+    def max_pairwise(self, points: np.ndarray, departure: datetime.datetime) -> float:
+        """Estimate the longest travel time between any two of ``points``, in minutes."""
+        return float(self.estimate(points, points, departure).max())
+
+    def _access(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the nearest zone indices and walk minutes to each, both of shape (len(points), k)."""
+        distances = distance_matrix_m(points, self.table.zones)
+        k = self.nearest_zones
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        walk = np.take_along_axis(distances, nearest, axis=1) / self.walk_metres_per_minute
+        return nearest, walk.astype(np.float32)
+
+
+class TravelTimeService:
+    """Travel times between points, estimated from a table where possible and routed exactly otherwise."""
+
+    def __init__(
+        self,
+        transport_network: "r5py.TransportNetwork | None" = None,
+        estimator: TravelTimeEstimator | None = None,
+        routing_worker: "RoutingWorker | None" = None,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            transport_network: Network for exact routing in the calling thread
+            estimator: Table-backed estimator used unless exact routing is requested
+            routing_worker: Shared worker for exact routing; preferred over ``transport_network``
+
+        """
+        if transport_network is None and estimator is None and routing_worker is None:
+            raise ValueError("A transport network, routing worker or travel time estimator must be provided")
+        self.transport_network = transport_network
+        self.estimator = estimator
+        self.routing_worker = routing_worker
+
+    def travel_time_matrix(
+        self,
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        departure: datetime.datetime,
+        exact: bool = False,
+        transport_modes: Sequence[str] = DEFAULT_TRANSPORT_MODES,
+    ) -> np.ndarray:
+        """
+        Travel times from every origin to every destination.
+
+        The table estimator is only used for the modes the table was built with
+        (``TABLE_TRANSPORT_MODES``); other modes are always routed.
+
+        Args:
+            origins: (n, 2) array of (lon, lat)
+            destinations: (m, 2) array of (lon, lat)
+            departure: Departure time
+            exact: Route with r5py even if a table estimator is available
+            transport_modes: ``r5py.TransportMode`` names
+
+        Returns:
+            float array of shape (n, m) in minutes; ``inf`` (estimate) or ``nan`` (exact) if unreachable
+
+        Raises:
+            ValueError: If the modes need routing and there is no network or worker
+
+        """
+        can_route = self.transport_network is not None or self.routing_worker is not None
+        table_modes = set(transport_modes) == set(TABLE_TRANSPORT_MODES)
+        if self.estimator is not None and table_modes and not (exact and can_route):
+            return self.estimator.estimate(origins, destinations, departure)
+        return self._route(origins, destinations, departure, transport_modes)
+
+    def max_pairwise_travel_time(
+        self,
+        points: np.ndarray,
+        departure: datetime.datetime,
+        exact: bool = False,
+        transport_modes: Sequence[str] = DEFAULT_TRANSPORT_MODES,
+    ) -> float:
+        """
+        Longest travel time between any two of ``points``, used to size the isochrone budget.
+
+        Args:
+            points: (n, 2) array of (lon, lat)
+            departure: Departure time
+            exact: Route with r5py even if a table estimator is available
+            transport_modes: ``r5py.TransportMode`` names
+
+        Returns:
+            Minutes, or ``inf`` if any pair is unreachable, whether estimated or routed
+
+        """
+        times = self.travel_time_matrix(points, points, departure, exact=exact, transport_modes=transport_modes)
+        return float(np.max(np.where(np.isnan(times), np.inf, times)))
+
+    def _route(
+        self,
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        departure: datetime.datetime,
+        transport_modes: Sequence[str],
+    ) -> np.ndarray:
+        if self.routing_worker is not None:
+            return self.routing_worker.submit_travel_times(origins, destinations, departure, transport_modes).result()
+        if self.transport_network is None:
+            raise ValueError("Exact routing requires a transport network")
+        return route_travel_times(
+            self.transport_network, origins, destinations, departure, transport_modes=transport_modes
+        )
+
+
+def route_travel_times(
+    transport_network: "r5py.TransportNetwork",
+    origins: np.ndarray,
+    destinations: np.ndarray,
+    departure: datetime.datetime,
+    *,
+    transport_modes: Sequence[str] = DEFAULT_TRANSPORT_MODES,
+    max_time_minutes: float | None = None,
+) -> np.ndarray:
+    """
+    Route every origin to every destination with r5py.
+
+    Args:
+        transport_network: Loaded r5py network
+        origins: (n, 2) array of (lon, lat)
+        destinations: (m, 2) array of (lon, lat)
+        departure: Departure time
+        transport_modes: ``r5py.TransportMode`` names
+        max_time_minutes: Routing cut-off; r5py's default if omitted
+
+    Returns:
+        float array of shape (n, m) in minutes; ``nan`` where unreachable
+
+    """
+    import geopandas as gpd
+    import r5py
+
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+
+    def to_gdf(points: np.ndarray) -> gpd.GeoDataFrame:
+        return gpd.GeoDataFrame(
+            {"id": np.arange(len(points))},
+            geometry=gpd.points_from_xy(points[:, 0], points[:, 1]),
+            crs="EPSG:4326",
+        )
+
+    kwargs = {} if max_time_minutes is None else {"max_time": datetime.timedelta(minutes=max_time_minutes)}
+    matrix = r5py.TravelTimeMatrix(
+        transport_network=transport_network,
+        origins=to_gdf(origins),
+        destinations=to_gdf(destinations),
+        departure=departure,
+        transport_modes=[r5py.TransportMode[mode] for mode in transport_modes],
+        **kwargs,
+    )
+    result = np.full((len(origins), len(destinations)), np.nan)
+    result[matrix["from_id"].to_numpy(), matrix["to_id"].to_numpy()] = matrix["travel_time"].to_numpy()
+    return result
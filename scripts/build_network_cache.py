@@ -1 +1,7 @@
 # Script for building the network cache from OSM and GTFS data, to pass to r5py
+import sys
+
+from compromeets.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["build-cache", *sys.argv[1:]]))
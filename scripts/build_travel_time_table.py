@@ -0,0 +1,56 @@
+r"""
+Script for precomputing the zone-to-zone travel time table used for fast estimates.
+
+Example usage:
+    python scripts/build_travel_time_table.py \\
+        --osm compromeets/artifacts/greater-london-260121.osm.pbf \\
+        --gtfs compromeets/artifacts/tfl-gtfs.zip \\
+        --output compromeets/artifacts/travel_time_table
+"""
+
+import argparse
+import datetime
+import logging
+from pathlib import Path
+
+from compromeets.data.travel_time_table import build_travel_time_table, slots_for_feeds, zones_from_gtfs
+from compromeets.services.transport_network_provider import get_transport_network
+
+
+def main():
+    """Build the travel time table for departure slots inside the feeds' service dates."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--osm", type=Path, required=True, help="OSM .pbf extract")
+    parser.add_argument("--gtfs", type=Path, nargs="+", required=True, help="GTFS .zip feeds")
+    parser.add_argument("--output", type=Path, required=True, help="Directory to write the table to")
+    parser.add_argument("--cell-size", type=float, default=250.0, help="Zone grid size in metres")
+    parser.add_argument("--max-time", type=int, default=120, help="Routing cut-off in minutes")
+    parser.add_argument(
+        "--weekday",
+        type=datetime.date.fromisoformat,
+        help="Date for the weekday slots (default: a Tuesday inside the feeds' service dates)",
+    )
+    parser.add_argument(
+        "--weekend",
+        type=datetime.date.fromisoformat,
+        help="Date for the weekend slot (default: a Saturday inside the feeds' service dates)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    departures = slots_for_feeds(args.gtfs, weekday=args.weekday, weekend=args.weekend)
+    print("Departure slots: " + ", ".join(f"{slot} {dt:%a %Y-%m-%d %H:%M}" for slot, dt in departures.items()))
+    zones = zones_from_gtfs(args.gtfs, cell_size_m=args.cell_size)
+    size_mb = len(zones) ** 2 * 2 / (1024 * 1024)
+    print(f"Routing {len(zones)} zones (~{size_mb:.0f} MB per departure slot)")
+
+    transport_network = get_transport_network(args.osm, args.gtfs)
+    build_travel_time_table(
+        transport_network, zones, args.output, departures=departures, max_time_minutes=args.max_time
+    )
+    print(f"✓ Travel time table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
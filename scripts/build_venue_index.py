@@ -0,0 +1,41 @@
+r"""
+Script for extracting candidate venues from an OSM extract into a local venue index.
+
+Example usage:
+    python scripts/build_venue_index.py \\
+        compromeets/artifacts/greater-london-260121.osm.pbf \\
+        compromeets/artifacts/venues.npz
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+from compromeets.data.ingest.osm import extract_venues
+from compromeets.models.domain import VENUE_KINDS
+
+
+def main():
+    """Extract venues and save the index."""
+    if len(sys.argv) < 3:  # noqa
+        print("Usage: python scripts/build_venue_index.py <osm_pbf> <output_npz>")
+        sys.exit(1)
+
+    osm_pbf = Path(sys.argv[1])
+    output_path = Path(sys.argv[2])
+    if not osm_pbf.exists():
+        print(f"Error: Input path does not exist: {osm_pbf}")
+        sys.exit(1)
+
+    venue_index = extract_venues(osm_pbf)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    venue_index.save(output_path)
+
+    counts = Counter(venue_index.venues.kind_names())
+    print(f"✓ Saved {len(venue_index)} venues to {output_path}")
+    for kind in VENUE_KINDS:
+        print(f"  {kind}: {counts[kind]}")
+
+
+if __name__ == "__main__":
+    main()
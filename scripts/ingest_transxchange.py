@@ -7,9 +7,11 @@ timetable data (from BODS or other sources) into GTFS format.
 Example usage:
     python scripts/ingest_transxchange.py \\
         compromeets/artifacts/bods_transxchange/operator.zip \\
-        compromeets/artifacts/bods_gtfs.zip
+        compromeets/artifacts/bods_gtfs.zip \\
+        --naptan compromeets/artifacts/Stops.csv
 """
 
+import argparse
 import os
 import sys
 import tempfile
@@ -21,30 +23,29 @@ import pandas as pd
 from compromeets.data.ingest.transxchange import convert_transxchange_to_gtfs
 
 
-# Create ZIP file from your downloaded Stops.csv - only if it doesn't exist
-def create_naptan_zip():
+# Create ZIP file from your downloaded Stops.csv - only if it doesn't exist or is older
+def create_naptan_zip(stops_csv: Path):
     """Create NaPTAN_data.zip from the downloaded Stops.csv file"""
     temp_dir = tempfile.gettempdir()
     target_dir = os.path.join(temp_dir, "transx2gtfs")
     target_zip = os.path.join(target_dir, "NaPTAN_data.zip")
 
-    # Only create if it doesn't exist
-    if os.path.exists(target_zip):
+    if not stops_csv.exists():
+        raise FileNotFoundError(f"Stops.csv not found at {stops_csv}")
+
+    # Only create if it doesn't exist, or the CSV has been refreshed since
+    if os.path.exists(target_zip) and os.path.getmtime(target_zip) >= stops_csv.stat().st_mtime:
         return target_zip
 
     # Create directory if it doesn't exist
-    if not os.path.exists(target_dir):
-        os.makedirs(target_dir)
-
-    # Path to your downloaded CSV
-    stops_csv = Path("compromeets/artifacts/Stops.csv")
+    os.makedirs(target_dir, exist_ok=True)
 
-    if not stops_csv.exists():
-        raise FileNotFoundError(f"Stops.csv not found at {stops_csv}")
-
-    # Create ZIP file with Stops.csv inside
-    with zipfile.ZipFile(target_zip, "w", zipfile.ZIP_DEFLATED) as zf:
+    # Create ZIP file with Stops.csv inside, then rename into place so that parallel
+    # pipeline stages never see a half-written archive
+    tmp_zip = f"{target_zip}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp_zip, "w", zipfile.ZIP_DEFLATED) as zf:
         zf.write(stops_csv, arcname="Stops.csv")
+    os.replace(tmp_zip, target_zip)
 
     print(f"Created NaPTAN ZIP at: {target_zip}")
     return target_zip
@@ -157,18 +158,20 @@ def fix_gtfs_issues(gtfs_path: Path) -> None:
 
 def main():
     """Convert TransXChange to GTFS."""
-    if len(sys.argv) < 3:  # noqa
-        print("Usage: python scripts/ingest_transxchange.py <input_path> <output_path>")
-        print("\nExample:")
-        print("  python scripts/ingest_transxchange.py \\")
-        print("    compromeets/artifacts/journey-planner-timetables.zip \\")
-        print("    compromeets/artifacts/tfl-gtfs.zip")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_path", type=Path, help="TransXChange .zip, .xml or directory")
+    parser.add_argument("output_path", type=Path, help="GTFS .zip to write")
+    parser.add_argument(
+        "--naptan", type=Path, help="NaPTAN Stops.csv used to fix stop coordinates; skipped if not given"
+    )
+    args = parser.parse_args()
 
-    create_naptan_zip()
+    input_path = args.input_path
+    output_path = args.output_path
+    naptan_csv = args.naptan
 
-    input_path = Path(sys.argv[1])
-    output_path = Path(sys.argv[2])
+    if naptan_csv is not None:
+        create_naptan_zip(naptan_csv)
 
     if not input_path.exists():
         print(f"Error: Input path does not exist: {input_path}")
@@ -190,11 +193,10 @@ def main():
         )
 
         # Fix coordinates using NAPTAN data
-        naptan_csv = Path("compromeets/artifacts/Stops.csv")
-        if naptan_csv.exists():
+        if naptan_csv is not None:
             fix_stop_coordinates(output_path, naptan_csv)
         else:
-            print(f"\n⚠ Warning: NAPTAN Stops.csv not found at {naptan_csv}")
+            print("\n⚠ Warning: no NAPTAN Stops.csv given (--naptan)")
             print("  Stop coordinates will not be updated")
 
         # Fix other GTFS issues
@@ -0,0 +1,19 @@
+"""
+Script for running the ingestion pipeline incrementally.
+
+Stages whose inputs are unchanged since the last successful run are skipped; independent
+stages run in parallel.
+
+Example usage:
+    python scripts/run_pipeline.py --workers 4
+    python scripts/run_pipeline.py --force transxchange:tfl
+
+Equivalent to ``compromeets ingest``.
+"""
+
+import sys
+
+from compromeets.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["ingest", *sys.argv[1:]]))
@@ -0,0 +1,33 @@
+"""Fixtures shared by the unit tests."""
+
+import json
+
+import numpy as np
+import pytest
+
+from compromeets.data.travel_time_table import UNREACHABLE
+
+
+@pytest.fixture
+def table_dir(tmp_path):
+    """
+    Write a small travel time table to disk.
+
+    Three zones lie about 5 km apart along an east-west line in London, at (-0.20, 51.5),
+    (-0.13, 51.5) and (-0.06, 51.5). The Monday 2026-02-02 08:00 slot has 10 and 12 minute
+    hops between neighbours and 25 minutes end to end; nothing is reachable at the weekend.
+    """
+    zones = np.array([[-0.20, 51.5], [-0.13, 51.5], [-0.06, 51.5]])
+    times = np.array([[0, 10, 25], [10, 0, 12], [25, 12, 0]], dtype=np.uint16)
+    np.save(tmp_path / "zones.npy", zones)
+    np.save(tmp_path / "times_weekday_0800.npy", times)
+    np.save(tmp_path / "times_weekend_1200.npy", np.full((3, 3), UNREACHABLE, dtype=np.uint16))
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump(
+            {
+                "slots": {"weekday_0800": "2026-02-02T08:00:00", "weekend_1200": "2026-02-01T12:00:00"},
+                "max_time_minutes": 120,
+            },
+            f,
+        )
+    return tmp_path
@@ -0,0 +1,181 @@
+"""Unit tests for the command line entry point and the daemon protocol."""
+
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from compromeets import daemon
+from compromeets.cli import build_parser, main
+from compromeets.config import PROJECT_ROOT
+from compromeets.models.inputs import SuggestResponse
+
+POSTCODES = ["SW1A 1AA", "E1 6AN"]
+
+
+class FakeSuggestService:
+    """Echoes the request back in a fixed response."""
+
+    def __init__(self):
+        self.requests = []
+
+    def suggest(self, request):
+        if "ZZ9 9ZZ" in request.postcodes:
+            raise KeyError("Unknown postcode: ZZ9 9ZZ")
+        self.requests.append(request)
+        return SuggestResponse(request_id="r1", budget_minutes=30, postcodes_in_overlap=len(request.postcodes))
+
+    def map(self, request_id, zoom):
+        if request_id != "r1":
+            raise KeyError(f"Unknown request id: {request_id}")
+        return {"type": "Topology", "zoom": zoom}
+
+
+class FakeContext:
+    """Context manager handing out a fake service, like SuggestService.from_artifacts."""
+
+    def __init__(self, service):
+        self.service = service
+
+    def __enter__(self):
+        return self.service
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    service = FakeSuggestService()
+    server = daemon.DaemonServer(tmp_path / "d.sock", service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestCli:
+    """Test suite for the CLI."""
+
+    def test_startup_does_not_import_heavy_dependencies(self):
+        """Test that parsing and --help load neither numpy, shapely nor r5py."""
+        code = (
+            "import sys\n"
+            "from compromeets.cli import build_parser\n"
+            "try:\n"
+            "    build_parser().parse_args(['suggest', '--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted({'numpy', 'shapely', 'pandas', 'r5py', 'pydantic'} & set(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+        )
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+    def test_parser_routes_subcommands(self):
+        """Test that each subcommand gets its handler and defaults."""
+        parser = build_parser()
+        args = parser.parse_args(["suggest", *POSTCODES, "--kind", "pub", "cafe"])
+        assert args.postcodes == POSTCODES
+        assert args.kind == ["pub", "cafe"]
+        with pytest.raises(SystemExit):
+            parser.parse_args(["suggest", *POSTCODES, "--kind", "nightclub"])
+        assert args.handler.__name__ == "cmd_suggest"
+        assert parser.parse_args(["ingest", "--force", "tfl"]).force == ["tfl"]
+        assert parser.parse_args(["build-cache"]).handler.__name__ == "cmd_build_cache"
+
+    def test_suggest_uses_running_daemon(self, running_daemon, capsys):
+        """Test that suggest is answered by the daemon rather than loading artifacts."""
+        exit_code = main(["suggest", *POSTCODES, "--socket", str(running_daemon.socket_path)])
+
+        assert exit_code == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["budget_minutes"] == 30
+        assert output["postcodes_in_overlap"] == 2
+        assert running_daemon.service.requests[0].postcodes == POSTCODES
+
+    def test_daemon_refuses_to_start_before_loading(self, running_daemon, capsys, monkeypatch):
+        """Test that a second daemon exits before spending time loading the network."""
+        from compromeets.services.suggest_service import SuggestService
+
+        monkeypatch.setattr(SuggestService, "from_artifacts", pytest.fail)
+
+        assert main(["daemon", "--socket", str(running_daemon.socket_path)]) == 1
+        assert "already listening" in capsys.readouterr().out
+
+    def test_modes_reach_the_daemon(self, running_daemon, capsys):
+        """Test that --mode is sent with the query."""
+        main(["suggest", *POSTCODES, "--mode", "BICYCLE", "--socket", str(running_daemon.socket_path)])
+        assert running_daemon.service.requests[0].transport_modes == ["BICYCLE"]
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["suggest", *POSTCODES, "--mode", "HOVERCRAFT"])
+
+    @pytest.mark.parametrize(
+        ("extra", "message"),
+        [(["ZZ9 9ZZ"], "Unknown postcode: ZZ9 9ZZ"), (["--budget-ratio", "2"], "budget_ratio")],
+    )
+    def test_query_errors_are_reported_without_traceback(self, running_daemon, capsys, extra, message):
+        """Test that bad postcodes and invalid options print a message and exit 1."""
+        argv = ["suggest", *POSTCODES, *extra, "--socket", str(running_daemon.socket_path)]
+        assert main(argv) == 1
+        assert message in capsys.readouterr().err
+
+    def test_in_process_unknown_postcode_is_reported(self, capsys, monkeypatch):
+        """Test that in-process KeyErrors are reported as a plain message."""
+        from compromeets.services.suggest_service import SuggestService
+
+        service = FakeSuggestService()
+        monkeypatch.setattr(SuggestService, "from_artifacts", lambda *args: FakeContext(service))
+
+        assert main(["suggest", *POSTCODES, "ZZ9 9ZZ", "--no-daemon"]) == 1
+        assert capsys.readouterr().err.strip() == "Error: Unknown postcode: ZZ9 9ZZ"
+
+    def test_map_fetches_from_daemon(self, running_daemon, capsys):
+        """Test that map returns the daemon's cached topology for a request id."""
+        exit_code = main(["map", "r1", "--zoom", "13", "--socket", str(running_daemon.socket_path)])
+
+        assert exit_code == 0
+        assert json.loads(capsys.readouterr().out) == {"type": "Topology", "zoom": 13}
+        with pytest.raises(RuntimeError, match="Unknown request id"):
+            daemon.request(running_daemon.socket_path, "map", {"request_id": "gone", "zoom": 13})
+
+
+class TestDaemon:
+    """Test suite for the daemon protocol."""
+
+    def test_ping_and_running_check(self, running_daemon, tmp_path):
+        """Test that a live socket is detected and a missing one is not."""
+        assert daemon.request(running_daemon.socket_path, "ping") == "pong"
+        assert daemon.is_running(running_daemon.socket_path)
+        assert not daemon.is_running(tmp_path / "missing.sock")
+
+    def test_errors_are_reported_to_the_client(self, running_daemon):
+        """Test that validation errors and unknown commands come back as RuntimeError."""
+        with pytest.raises(RuntimeError, match="ValidationError"):
+            daemon.request(running_daemon.socket_path, "suggest", {"postcodes": ["SW1A 1AA"]})
+        with pytest.raises(RuntimeError, match="Unknown command"):
+            daemon.request(running_daemon.socket_path, "shutdown")
+
+    def test_socket_directory_is_private(self, tmp_path):
+        """Test that a missing socket directory is created for this user only."""
+        server = daemon.DaemonServer(tmp_path / "run" / "d.sock", FakeSuggestService())
+        server.server_close()
+        assert (tmp_path / "run").stat().st_mode & 0o777 == 0o700
+
+    def test_refuses_shared_socket_directory(self, tmp_path):
+        """Test that a directory other users can write to, without the sticky bit, is rejected."""
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o777)
+        with pytest.raises(PermissionError, match="writable by other users"):
+            daemon.DaemonServer(shared / "d.sock", FakeSuggestService())
+
+    def test_refuses_to_replace_a_live_daemon(self, running_daemon):
+        """Test that a second daemon on the same socket fails instead of stealing it."""
+        with pytest.raises(RuntimeError, match="already listening"):
+            daemon.DaemonServer(running_daemon.socket_path, FakeSuggestService())
@@ -143,6 +143,19 @@ class TestGooglePlacesClient:
         )
         client.close()
 
+    @patch("compromeets.clients.google_places_client.httpx.Client")
+    def test_search_nearby_rank_preference(self, mock_client_class):
+        """Test that a rank preference is sent only when given."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+
+        client = GooglePlacesClient(api_key="test-key")
+        client.search_nearby({"latitude": 51.5, "longitude": -0.1}, 500, ["pub"], rank_preference="DISTANCE")
+        assert mock_client.post.call_args.kwargs["json"]["rankPreference"] == "DISTANCE"
+        client.search_nearby({"latitude": 51.5, "longitude": -0.1}, 500, ["pub"])
+        assert "rankPreference" not in mock_client.post.call_args.kwargs["json"]
+        client.close()
+
     def test_context_manager(self):
         """Test that client can be used as a context manager."""
         with patch("compromeets.clients.google_places_client.httpx.Client") as mock_client_class:
@@ -0,0 +1,76 @@
+"""Unit tests for the meeting area service and postcode resolver."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point
+
+from compromeets.services.meeting_area_service import MeetingAreaService
+from compromeets.services.postcode_resolver import PostcodeResolver
+
+
+@pytest.fixture
+def resolver():
+    """A resolver over a handful of London postcodes."""
+    postcodes = np.array(["E14 2DF", "N7 0AA", "SW2 1AB", "WC2N 5DU"])
+    coords = np.array([[-0.0235, 51.5050], [-0.1180, 51.5520], [-0.1200, 51.4520], [-0.1276, 51.5074]])
+    return PostcodeResolver(postcodes, coords)
+
+
+class TestPostcodeResolver:
+    """Test suite for PostcodeResolver."""
+
+    def test_resolve_normalises_format(self, resolver):
+        """Test that spacing and case are normalised before lookup."""
+        assert resolver.resolve("wc2n5du") == (-0.1276, 51.5074)
+        assert resolver.resolve(" N7  0AA ") == (-0.1180, 51.5520)
+
+    def test_resolve_unknown(self, resolver):
+        """Test that unknown postcodes raise KeyError."""
+        with pytest.raises(KeyError, match="Unknown postcode"):
+            resolver.resolve("ZZ9 9ZZ")
+
+
+class TestMeetingAreaService:
+    """Test suite for MeetingAreaService."""
+
+    def test_find_meeting_area(self, resolver):
+        """Test that only postcodes inside every isochrone are returned."""
+        service = MeetingAreaService(postcode_index=resolver.index)
+        isochrones = [Point(-0.10, 51.50).buffer(0.04), Point(-0.14, 51.51).buffer(0.04)]
+        area = service.find_meeting_area(isochrones)
+        assert list(area.postcodes.ids) == ["WC2N 5DU"]
+        np.testing.assert_allclose(area.postcodes.coords, [[-0.1276, 51.5074]])
+        assert area.overlap.contains(Point(area.center))
+        assert area.radius_m > 0
+
+    def test_venues_only_looked_up_when_asked(self, resolver):
+        """Test that the overlap's venues are only queried when kinds are given."""
+        venue_index = Mock()
+        service = MeetingAreaService(postcode_index=resolver.index, venue_index=venue_index)
+        isochrones = [Point(-0.10, 51.50).buffer(0.04), Point(-0.14, 51.51).buffer(0.04)]
+        assert len(service.find_meeting_area(isochrones).venues) == 0
+        venue_index.venues_in.assert_not_called()
+        area = service.find_meeting_area(isochrones, venue_kinds=["pub"])
+        venue_index.venues_in.assert_called_once_with(area.overlap, ["pub"])
+
+    def test_touching_isochrones_keep_only_the_polygonal_overlap(self):
+        """Test that lines left where isochrones only touch are dropped from the overlap."""
+        touching = shapely.union(shapely.box(1, 0, 3, 1), shapely.box(2, 1, 3, 2))  # shares the edge x=2 above y=1
+        area = MeetingAreaService().find_meeting_area([shapely.box(0, 0, 2, 2), touching])
+        assert area.overlap.geom_type == "Polygon"
+        assert area.overlap.equals(shapely.box(1, 0, 2, 1))
+
+    def test_no_overlap(self, resolver):
+        """Test that disjoint isochrones give an empty area with no postcodes."""
+        service = MeetingAreaService(postcode_index=resolver.index)
+        area = service.find_meeting_area([Point(0, 0).buffer(0.01), Point(1, 1).buffer(0.01)])
+        assert area.overlap.is_empty
+        assert len(area.postcodes) == 0
+
+    def test_no_isochrones(self):
+        """Test that an empty input is rejected."""
+        with pytest.raises(ValueError, match="No valid isochrones"):
+            MeetingAreaService().find_meeting_area([])
@@ -0,0 +1,109 @@
+"""Unit tests for the domain and API boundary models."""
+
+import dataclasses
+import datetime
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from compromeets.models.domain import CandidateCells, Origins, Venues
+from compromeets.models.inputs import SuggestRequest, VenueSuggestion
+
+
+class TestDomainModels:
+    """Test suite for the array-backed domain models."""
+
+    def test_arrays_are_zero_copy_read_only_views(self):
+        """Test that matching-dtype arrays are shared, not copied, and cannot be mutated through the model."""
+        coords = np.array([[-0.1, 51.5], [-0.2, 51.4]])
+        origins = Origins(coords)
+        assert np.shares_memory(origins.coords, coords)
+        with pytest.raises(ValueError, match="read-only"):
+            origins.coords[0, 0] = 0
+        coords[0, 0] = 1.0  # the caller's array stays writeable
+        assert origins.coords[0, 0] == 1.0
+
+    def test_models_are_frozen_and_slotted(self):
+        """Test that fields can't be reassigned or added."""
+        origins = Origins(np.zeros((1, 2)))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            origins.coords = np.ones((1, 2))
+        assert not hasattr(origins, "__dict__")
+
+    def test_length_mismatch_rejected(self):
+        """Test that columns must line up."""
+        with pytest.raises(ValueError, match="labels has length 1, expected 2"):
+            Origins(np.zeros((2, 2)), labels=("A1 1AA",))
+        with pytest.raises(ValueError, match="ids has length 2, expected 3"):
+            CandidateCells(np.zeros((3, 2)), np.arange(2))
+        with pytest.raises(ValueError, match="travel_times has shape"):
+            CandidateCells(np.zeros((3, 2)), np.arange(3), travel_times=np.zeros((2, 4)))
+
+    def test_candidate_travel_times_follow_take(self):
+        """Test that per-person travel times are reordered with their cells."""
+        cells = CandidateCells(np.zeros((3, 2)), np.array(["a", "b", "c"])).with_travel_times(
+            np.array([[10, 20, 5], [30, np.nan, 6]])
+        )
+        assert cells.travel_times.dtype == np.float32
+        assert list(cells.longest_trips()) == [30, np.inf, 6]
+        ranked = cells.take(np.argsort(cells.longest_trips()))
+        assert list(ranked.ids) == ["c", "a", "b"]
+        np.testing.assert_array_equal(ranked.travel_times[:, 0], [5, 6])
+
+    def test_venues_take_and_with_ratings(self):
+        """Test subsetting venues and replacing ratings."""
+        venues = Venues(np.array([[0.0, 0.0], [1.0, 1.0]]), [0, 2], ["A", "B"], [10, -20])
+        assert np.isnan(venues.ratings).all()
+        assert list(venues.rating_counts) == [-1, -1]
+
+        subset = venues.take(np.array([1]))
+        assert list(subset.names) == ["B"]
+        assert subset.kind_names() == ["cafe"]
+
+        rated = venues.with_ratings(np.array([4.5, np.nan]), np.array([10, -1]))
+        assert np.shares_memory(rated.coords, venues.coords)
+        assert rated.ratings[0] == pytest.approx(4.5)
+
+        timed = rated.with_travel_times(np.array([[12.0, 30.0]]))
+        assert timed.ratings[0] == pytest.approx(4.5)
+        assert timed.take(np.array([1])).travel_times.tolist() == [[30.0]]
+
+
+class TestSuggestRequest:
+    """Test suite for the boundary request model."""
+
+    def test_valid_request_converts_to_group(self):
+        """Test that a validated request becomes a domain group."""
+        request = SuggestRequest(postcodes=[" e14 2df", "N7 0AA"], departure="2026-02-02T08:00:00")
+        group = request.to_group(np.array([[-0.02, 51.5], [-0.12, 51.55]]))
+        assert group.origins.labels == ("E14 2DF", "N7 0AA")
+        assert group.departure == datetime.datetime(2026, 2, 2, 8, 0)
+        assert group.transport_modes == ("TRANSIT", "WALK")
+        assert len(group.origins) == 2
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"postcodes": ["E14 2DF"]},
+            {"postcodes": ["E14 2DF", "  "]},
+            {"venue_kinds": ["nightclub"]},
+            {"budget_ratio": 0},
+            {"transport_modes": ["TELEPORT"]},
+        ],
+    )
+    def test_invalid_requests_rejected(self, overrides):
+        """Test that invalid input is rejected at the boundary."""
+        fields = {"postcodes": ["E14 2DF", "N7 0AA"], "departure": "2026-02-02T08:00:00", **overrides}
+        with pytest.raises(ValidationError):
+            SuggestRequest(**fields)
+
+    def test_venue_suggestions_from_venues(self):
+        """Test that response items are built from venue columns."""
+        venues = Venues(np.array([[-0.12, 51.51]]), [0], ["The Lamb"], [1], [4.25], [300])
+        (suggestion,) = VenueSuggestion.from_venues(venues)
+        assert suggestion.name == "The Lamb"
+        assert suggestion.kind == "pub"
+        assert suggestion.rating == pytest.approx(4.25)
+        assert suggestion.user_rating_count == 300
+        assert suggestion.longitude == pytest.approx(-0.12)
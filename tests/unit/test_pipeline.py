@@ -0,0 +1,178 @@
+"""Unit tests for the incremental ingestion pipeline runner."""
+
+import threading
+
+import pytest
+
+from compromeets.data import stages as stages_module
+from compromeets.data.pipeline import FileHasher, PipelineRunner, Stage, StageStatus
+
+
+def copy_stage(name, src, dst, calls, transform=str.upper):
+    """A stage that writes a transformed copy of ``src`` to ``dst`` and records each run."""
+
+    def run():
+        calls.append(name)
+        dst.write_text(transform(src.read_text()))
+
+    return Stage(name=name, run=run, inputs=[src], outputs=[dst])
+
+
+class TestFileHasher:
+    """Test suite for FileHasher."""
+
+    def test_hash_changes_with_content(self, tmp_path):
+        """Test that editing a file changes its digest."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        first = FileHasher().hash(path)
+        path.write_text("two")
+        assert FileHasher().hash(path) != first
+
+    def test_directory_hash_covers_file_names(self, tmp_path):
+        """Test that renaming a file inside a directory changes the directory digest."""
+        (tmp_path / "d").mkdir()
+        (tmp_path / "d" / "a.txt").write_text("x")
+        first = FileHasher().hash(tmp_path / "d")
+        (tmp_path / "d" / "a.txt").rename(tmp_path / "d" / "b.txt")
+        assert FileHasher().hash(tmp_path / "d") != first
+
+
+class TestPipelineRunner:
+    """Test suite for PipelineRunner."""
+
+    def test_runs_then_skips_unchanged(self, tmp_path):
+        """Test that a second run with unchanged inputs skips every stage."""
+        src, mid, out = tmp_path / "src.txt", tmp_path / "mid.txt", tmp_path / "out.txt"
+        src.write_text("hello")
+        calls = []
+        stages = [copy_stage("b", mid, out, calls), copy_stage("a", src, mid, calls)]
+        manifest = tmp_path / "manifest.json"
+
+        assert PipelineRunner(stages, manifest).run() == {"a": StageStatus.RAN, "b": StageStatus.RAN}
+        assert calls == ["a", "b"]
+        assert out.read_text() == "HELLO"
+
+        calls.clear()
+        assert PipelineRunner(stages, manifest).run() == {"a": StageStatus.SKIPPED, "b": StageStatus.SKIPPED}
+        assert calls == []
+
+    def test_reruns_only_changed_branch(self, tmp_path):
+        """Test that changing one input reruns only the stages downstream of it."""
+        calls = []
+        stages = []
+        for name in ("x", "y"):
+            (tmp_path / f"{name}.in").write_text(name)
+            stages.append(copy_stage(name, tmp_path / f"{name}.in", tmp_path / f"{name}.out", calls))
+        manifest = tmp_path / "manifest.json"
+        PipelineRunner(stages, manifest).run()
+
+        calls.clear()
+        (tmp_path / "x.in").write_text("changed")
+        statuses = PipelineRunner(stages, manifest).run()
+        assert statuses == {"x": StageStatus.RAN, "y": StageStatus.SKIPPED}
+        assert calls == ["x"]
+
+    def test_identical_upstream_output_does_not_invalidate_downstream(self, tmp_path):
+        """Test that downstream stages are keyed on content, not on whether upstream ran."""
+        src, mid, out = tmp_path / "src.txt", tmp_path / "mid.txt", tmp_path / "out.txt"
+        src.write_text("hello")
+        calls = []
+        stages = [copy_stage("a", src, mid, calls), copy_stage("b", mid, out, calls)]
+        manifest = tmp_path / "manifest.json"
+        PipelineRunner(stages, manifest).run()
+
+        calls.clear()
+        src.write_text("HELLO")  # upper-cases to the same intermediate
+        statuses = PipelineRunner(stages, manifest).run()
+        assert statuses == {"a": StageStatus.RAN, "b": StageStatus.SKIPPED}
+
+    def test_missing_output_forces_rerun(self, tmp_path):
+        """Test that a deleted output is rebuilt even when inputs are unchanged."""
+        src, out = tmp_path / "src.txt", tmp_path / "out.txt"
+        src.write_text("hello")
+        calls = []
+        stages = [copy_stage("a", src, out, calls)]
+        manifest = tmp_path / "manifest.json"
+        PipelineRunner(stages, manifest).run()
+
+        out.unlink()
+        assert PipelineRunner(stages, manifest).run() == {"a": StageStatus.RAN}
+        assert out.exists()
+
+    def test_independent_stages_run_in_parallel(self, tmp_path):
+        """Test that stages without a dependency between them run concurrently."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def make(name):
+            out = tmp_path / f"{name}.out"
+
+            def run():
+                barrier.wait()  # deadlocks (and times out) if run serially
+                out.write_text(name)
+
+            return Stage(name=name, run=run, outputs=[out])
+
+        statuses = PipelineRunner([make("p"), make("q")], tmp_path / "manifest.json", max_workers=2).run()
+        assert statuses == {"p": StageStatus.RAN, "q": StageStatus.RAN}
+
+    def test_failure_blocks_downstream(self, tmp_path):
+        """Test that a failing stage blocks its dependants but not unrelated stages."""
+        mid, other = tmp_path / "mid.txt", tmp_path / "other.txt"
+
+        def fail():
+            raise RuntimeError("boom")
+
+        calls = []
+        stages = [
+            Stage(name="a", run=fail, outputs=[mid]),
+            copy_stage("b", mid, tmp_path / "out.txt", calls),
+            Stage(name="c", run=lambda: other.write_text("ok"), outputs=[other]),
+        ]
+        statuses = PipelineRunner(stages, tmp_path / "manifest.json").run()
+        assert statuses == {"a": StageStatus.FAILED, "b": StageStatus.BLOCKED, "c": StageStatus.RAN}
+        assert calls == []
+
+    def test_force_reruns_stage(self, tmp_path):
+        """Test that forced stages run even when up to date."""
+        src, out = tmp_path / "src.txt", tmp_path / "out.txt"
+        src.write_text("hello")
+        calls = []
+        stages = [copy_stage("a", src, out, calls)]
+        manifest = tmp_path / "manifest.json"
+        PipelineRunner(stages, manifest).run()
+        assert PipelineRunner(stages, manifest).run(force=["a"]) == {"a": StageStatus.RAN}
+
+    def test_cycle_rejected(self, tmp_path):
+        """Test that a dependency cycle is rejected up front."""
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        stages = [copy_stage("x", a, b, []), copy_stage("y", b, a, [])]
+        with pytest.raises(ValueError, match="cycle"):
+            PipelineRunner(stages, tmp_path / "manifest.json")
+
+    def test_duplicate_output_rejected(self, tmp_path):
+        """Test that two stages writing the same path are rejected."""
+        out = tmp_path / "out.txt"
+        stages = [Stage(name="a", run=lambda: None, outputs=[out]), Stage(name="b", run=lambda: None, outputs=[out])]
+        with pytest.raises(ValueError, match="written by both"):
+            PipelineRunner(stages, tmp_path / "manifest.json")
+
+
+class TestStages:
+    """Test suite for the stage declarations."""
+
+    def test_transxchange_stage_passes_declared_naptan(self, tmp_path, monkeypatch):
+        """Test that the script gets the NaPTAN file the stage hashes, and none when there isn't one."""
+        commands = []
+        monkeypatch.setattr(stages_module.subprocess, "run", lambda cmd, **kwargs: commands.append(cmd))
+        naptan = tmp_path / "Stops.csv"
+
+        with_naptan = stages_module.transxchange_stage("op", tmp_path / "op.zip", tmp_path / "op-gtfs.zip", naptan)
+        without_naptan = stages_module.transxchange_stage("op", tmp_path / "op.zip", tmp_path / "op-gtfs.zip", None)
+        with_naptan.run()
+        without_naptan.run()
+
+        assert with_naptan.inputs == (tmp_path / "op.zip", naptan)
+        assert commands[0][-2:] == ["--naptan", str(naptan)]
+        assert without_naptan.inputs == (tmp_path / "op.zip",)
+        assert "--naptan" not in commands[1]
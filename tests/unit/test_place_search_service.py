@@ -0,0 +1,136 @@
+"""Unit tests for local venue search and Places enrichment."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from shapely.geometry import Point
+
+from compromeets.data.venue_index import VenueIndex
+from compromeets.models.domain import Venues
+from compromeets.services.place_search_service import PlaceSearchService, normalise_name
+
+
+@pytest.fixture
+def venue_index():
+    """Three venues around Covent Garden and one far away in Greenwich."""
+    coords = np.array([[-0.1240, 51.5120], [-0.1230, 51.5115], [-0.1250, 51.5110], [0.0000, 51.4800]])
+    return VenueIndex(
+        Venues(
+            coords,
+            kinds=np.array([0, 2, 0, 0], dtype=np.uint8),  # pub, cafe, pub, pub
+            names=np.array(["The Lamb", "Bean There", "", "The Far Away"]),
+            osm_ids=np.array([1, 2, 3, -4]),
+        )
+    )
+
+
+@pytest.fixture
+def area():
+    """A small area around Covent Garden."""
+    return Point(-0.1240, 51.5115).buffer(0.005)
+
+
+class TestVenueIndex:
+    """Test suite for VenueIndex."""
+
+    def test_save_and_load_round_trip(self, tmp_path, venue_index, area):
+        """Test that a saved index loads with the same contents."""
+        venue_index.save(tmp_path / "venues.npz")
+        loaded = VenueIndex.load(tmp_path / "venues.npz")
+        assert list(loaded.venues.names) == list(venue_index.venues.names)
+        assert list(loaded.query(area)) == [0, 1, 2]
+
+    def test_query_filters_kinds(self, venue_index, area):
+        """Test that kind filtering is applied after the spatial query."""
+        assert list(venue_index.query(area, ["pub"])) == [0, 2]
+
+    def test_unknown_kind(self, venue_index, area):
+        """Test that unknown kinds are rejected."""
+        with pytest.raises(ValueError, match="Unknown venue kinds"):
+            venue_index.query(area, ["nightclub"])
+
+
+class TestPlaceSearchService:
+    """Test suite for PlaceSearchService."""
+
+    def test_local_venues_need_no_client(self, venue_index, area):
+        """Test that local search works without Google."""
+        service = PlaceSearchService(venue_index=venue_index)
+        venues = service.local_venues(area, ["pub"])
+        assert list(venues.osm_ids) == [1, 3]
+        assert np.isnan(venues.ratings).all()
+
+    def test_count_venues_ranks_areas(self, venue_index, area):
+        """Test that venue counts are computed per area."""
+        service = PlaceSearchService(venue_index=venue_index)
+        counts = service.count_venues([area, Point(0, 51.48).buffer(0.001), Point(5, 5).buffer(0.1)])
+        assert list(counts) == [3, 1, 0]
+
+    def test_search_enriches_shortlist_with_one_call(self, venue_index, area):
+        """Test that only same-name results rate the shortlist, from a single Places request."""
+        client = Mock()
+        client.search_nearby.return_value = {
+            "places": [
+                {
+                    "displayName": {"text": "The Crown"},  # a neighbour, closer to The Lamb than the real one
+                    "rating": 3.2,
+                    "userRatingCount": 80,
+                    "location": {"latitude": 51.5120, "longitude": -0.1240},
+                },
+                {
+                    "displayName": {"text": "Lamb"},
+                    "rating": 4.1,
+                    "userRatingCount": 300,
+                    "location": {"latitude": 51.51201, "longitude": -0.12401},
+                },
+                {
+                    "displayName": {"text": "Unnamed pub"},
+                    "rating": 4.6,
+                    "userRatingCount": 50,
+                    "location": {"latitude": 51.51101, "longitude": -0.12501},
+                },
+                {
+                    "displayName": {"text": "Elsewhere"},
+                    "rating": 5.0,
+                    "location": {"latitude": 51.6, "longitude": -0.2},
+                },
+            ]
+        }
+        service = PlaceSearchService(venue_index=venue_index, places_client=client)
+        venues = service.search(area, ["pub"])
+
+        client.search_nearby.assert_called_once()
+        assert client.search_nearby.call_args.kwargs["rank_preference"] == "DISTANCE"
+        assert list(venues.osm_ids) == [1, 3]  # the nameless OSM pub cannot be matched, so stays unrated
+        np.testing.assert_allclose(venues.ratings, [4.1, np.nan], rtol=1e-6)
+        assert list(venues.rating_counts) == [300, -1]
+
+    @pytest.mark.parametrize(
+        ("osm", "google", "same"),
+        [
+            ("The Lamb & Flag", "Lamb and Flag", True),
+            ("Café Nero", "CAFFE NERO", False),
+            ("Café Rouge", "Cafe Rouge", True),
+            ("The Lamb", "Lamb and Flag", False),
+        ],
+    )
+    def test_normalise_name(self, osm, google, same):
+        """Test that spelling differences are ignored but different names stay different."""
+        assert (normalise_name(osm) == normalise_name(google)) is same
+
+    def test_search_shortlist_prefers_named_venues(self, venue_index, area):
+        """Test that named venues are shortlisted ahead of unnamed ones."""
+        service = PlaceSearchService(venue_index=venue_index)
+        venues = service.search(area, ["pub"], shortlist_size=1)
+        assert list(venues.names) == ["The Lamb"]
+
+    def test_falls_back_to_radius_search(self, area):
+        """Test that a Places radius search is used when there is no local index."""
+        client = Mock()
+        client.search_nearby.return_value = {
+            "places": [{"displayName": {"text": "A"}, "rating": 4.0, "location": {"latitude": 51.5, "longitude": -0.1}}]
+        }
+        venues = PlaceSearchService(places_client=client).search(area, ["pub"])
+        assert list(venues.names) == ["A"]
+        assert venues.kind_names() == ["pub"]
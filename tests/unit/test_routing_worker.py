@@ -0,0 +1,192 @@
+"""Unit tests for the micro-batching routing worker."""
+
+import datetime
+
+import numpy as np
+import pytest
+from shapely.geometry import Point
+
+from compromeets.services.isochrone_service import isochrone_grid, isochrones_from_times
+from compromeets.services.routing_worker import RoutingWorker
+from compromeets.services.travel_time_service import TravelTimeService, distance_matrix_m
+
+DEPARTURE = datetime.datetime(2026, 2, 2, 8, 0)
+ORIGIN = (-0.1276, 51.5074)
+
+
+class FakeRouter:
+    """Straight-line travel at 20 km/h, recording the shape of every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, origins, destinations, departure, *, transport_modes, max_time_minutes):
+        self.calls.append((len(origins), len(destinations), departure, transport_modes, max_time_minutes))
+        return distance_matrix_m(origins, destinations) / (20_000 / 60)
+
+
+def expected_times(origins, destinations):
+    """Travel times the fake router gives for a single request."""
+    return distance_matrix_m(np.asarray(origins), np.asarray(destinations)) / (20_000 / 60)
+
+
+class TestRoutingWorker:
+    """Test suite for RoutingWorker."""
+
+    def test_compatible_requests_share_one_router_call(self):
+        """Test that requests in the same window are coalesced and fanned back correctly."""
+        router = FakeRouter()
+        rng = np.random.default_rng(1)
+        requests = [(rng.normal(ORIGIN, 0.02, (2, 2)), rng.normal(ORIGIN, 0.02, (3, 2))) for _ in range(5)]
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_travel_times(o, d, DEPARTURE) for o, d in requests]
+            results = [f.result(timeout=5) for f in futures]
+
+        assert len(router.calls) == 1
+        assert router.calls[0][:2] == (10, 15)
+        for (origins, destinations), result in zip(requests, results, strict=True):
+            np.testing.assert_allclose(result, expected_times(origins, destinations), rtol=1e-4)
+
+    def test_shared_points_are_routed_once(self):
+        """Test that duplicate origins across requests are deduplicated."""
+        router = FakeRouter()
+        origins = np.array([ORIGIN])
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_travel_times(origins, np.array([[-0.1, 51.5]]), DEPARTURE) for _ in range(3)]
+            for future in futures:
+                future.result(timeout=5)
+        assert router.calls[0][:2] == (1, 1)
+
+    def test_incompatible_settings_are_routed_separately(self):
+        """Test that different departures or modes are not merged."""
+        router = FakeRouter()
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [
+                worker.submit_travel_times([ORIGIN], [ORIGIN], DEPARTURE),
+                worker.submit_travel_times([ORIGIN], [ORIGIN], DEPARTURE + datetime.timedelta(hours=1)),
+                worker.submit_travel_times([ORIGIN], [ORIGIN], DEPARTURE, transport_modes=["WALK"]),
+            ]
+            for future in futures:
+                future.result(timeout=5)
+        assert len(router.calls) == 3
+
+    def test_isochrones_batch_apart_from_travel_times(self):
+        """Test that isochrones and travel time requests are routed in separate calls."""
+        router = FakeRouter()
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            iso = worker.submit_isochrones(ORIGIN, [5, 10], DEPARTURE, resolution_m=250)
+            matrix = worker.submit_travel_times([ORIGIN], [[-0.1, 51.5]], DEPARTURE)
+            small, large = iso.result(timeout=5)
+            matrix.result(timeout=5)
+
+        assert sorted(call[4] is None for call in router.calls) == [False, True]
+        assert large.contains(small.buffer(-0.001))
+        assert large.contains(Point(ORIGIN))
+
+    def test_overlapping_isochrones_share_grid_points(self):
+        """Test that nearby isochrone grids share lattice points, so a batch routes about one grid."""
+        router = FakeRouter()
+        other = (ORIGIN[0] + 0.01, ORIGIN[1] + 0.005)
+        grids = [isochrone_grid(o, 15, resolution_m=250) for o in (ORIGIN, other)]
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_isochrones(o, [15], DEPARTURE, resolution_m=250) for o in (ORIGIN, other)]
+            for future in futures:
+                future.result(timeout=5)
+
+        ((n_origins, n_destinations, _, _, max_time),) = router.calls
+        assert (n_origins, max_time) == (2, 15)
+        assert n_destinations == len(np.unique(np.concatenate(grids), axis=0))
+        assert n_destinations < 1.2 * max(len(grid) for grid in grids)
+
+    def test_distant_isochrones_are_routed_apart(self):
+        """Test that isochrones whose grids do not overlap are not merged into one cross product."""
+        router = FakeRouter()
+        manchester = (-2.2426, 53.4808)
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_isochrones(o, [15], DEPARTURE, resolution_m=250) for o in (ORIGIN, manchester)]
+            for future in futures:
+                future.result(timeout=5)
+
+        assert sorted(call[0] for call in router.calls) == [1, 1]
+        assert [call[1] for call in router.calls] == [len(isochrone_grid(o, 15, 250)) for o in (manchester, ORIGIN)]
+
+    def test_batches_stay_within_max_cells(self):
+        """Test that overlapping requests are split once the merged matrix would exceed the cap."""
+        router = FakeRouter()
+        rng = np.random.default_rng(2)
+        requests = [(rng.normal(ORIGIN, 0.01, (2, 2)), rng.normal(ORIGIN, 0.01, (10, 2))) for _ in range(6)]
+        with RoutingWorker(router=router, batch_window_s=0.2, max_batch_cells=100) as worker:
+            futures = [worker.submit_travel_times(o, d, DEPARTURE) for o, d in requests]
+            results = [f.result(timeout=5) for f in futures]
+
+        assert len(router.calls) == 3
+        assert all(n * m <= 100 for n, m, *_ in router.calls)
+        for (origins, destinations), result in zip(requests, results, strict=True):
+            np.testing.assert_allclose(result, expected_times(origins, destinations), rtol=1e-4)
+
+    def test_isochrone_only_batches_cap_search_time(self):
+        """Test that isochrone-only batches pass the largest cutoff as max time."""
+        router = FakeRouter()
+        with RoutingWorker(router=router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_isochrones(ORIGIN, [c], DEPARTURE, resolution_m=500) for c in (5, 15)]
+            for future in futures:
+                future.result(timeout=5)
+        assert router.calls[0][4] == 15
+
+    def test_router_errors_reach_every_caller(self):
+        """Test that a failing batch fails each of its futures."""
+
+        def failing_router(*args, **kwargs):
+            raise RuntimeError("JVM exploded")
+
+        with RoutingWorker(router=failing_router, batch_window_s=0.2) as worker:
+            futures = [worker.submit_travel_times([ORIGIN], [ORIGIN], DEPARTURE) for _ in range(2)]
+            for future in futures:
+                with pytest.raises(RuntimeError, match="JVM exploded"):
+                    future.result(timeout=5)
+
+    def test_travel_time_service_routes_exactly_through_worker(self):
+        """Test that exact service requests go through the shared worker."""
+        router = FakeRouter()
+        points = np.array([ORIGIN, [-0.1, 51.5]])
+        with RoutingWorker(router=router) as worker:
+            service = TravelTimeService(routing_worker=worker)
+            result = service.max_pairwise_travel_time(points, DEPARTURE, exact=True)
+        assert result == pytest.approx(expected_times(points, points).max())
+        assert len(router.calls) == 1
+
+    def test_isochrone_grid_reaches_further_for_faster_modes(self):
+        """Test that car isochrones get a grid wide enough for driving speeds."""
+        router = FakeRouter()
+        with RoutingWorker(router=router) as worker:
+            worker.submit_isochrones(ORIGIN, [10], DEPARTURE, ["WALK"], resolution_m=500).result(timeout=5)
+            worker.submit_isochrones(ORIGIN, [10], DEPARTURE, ["CAR"], resolution_m=500).result(timeout=5)
+        walk_points, car_points = (call[1] for call in router.calls)
+        assert car_points > 50 * walk_points
+
+    def test_submit_after_stop(self):
+        """Test that a stopped worker rejects new requests."""
+        worker = RoutingWorker(router=FakeRouter()).start()
+        worker.stop()
+        with pytest.raises(RuntimeError, match="stopped"):
+            worker.submit_travel_times([ORIGIN], [ORIGIN], DEPARTURE)
+
+
+class TestIsochronesFromTimes:
+    """Test suite for grid-based isochrone construction."""
+
+    def test_reachable_cells_only(self):
+        """Test that only grid points within the cutoff are covered."""
+        grid = isochrone_grid(ORIGIN, 10, resolution_m=200, reach_speed_kmh=6)
+        times = expected_times([ORIGIN], grid)[0] * 4  # 5 km/h
+        times[0] = np.nan
+        (polygon,) = isochrones_from_times(grid, times, [5], resolution_m=200)
+        reachable = grid[times <= 5]
+        assert polygon.contains(Point(reachable[len(reachable) // 2]))
+        assert not polygon.contains(Point(grid[times > 8][0]))
+
+    def test_nothing_reachable(self):
+        """Test that an unreachable origin gives an empty polygon."""
+        grid = isochrone_grid(ORIGIN, 5, resolution_m=500)
+        (polygon,) = isochrones_from_times(grid, np.full(len(grid), np.nan), [5], resolution_m=500)
+        assert polygon.is_empty
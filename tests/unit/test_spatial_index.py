@@ -0,0 +1,40 @@
+"""Unit tests for the STRtree-backed point index."""
+
+import numpy as np
+import shapely
+from shapely.geometry import Point, Polygon
+
+from compromeets.data.spatial_index import PointIndex
+
+
+class TestPointIndex:
+    """Test suite for PointIndex."""
+
+    def test_query_matches_brute_force_within(self):
+        """Test that indexed results match a full scan with ``within``."""
+        rng = np.random.default_rng(0)
+        coords = np.column_stack([rng.uniform(-0.5, 0.3, 5000), rng.uniform(51.3, 51.7, 5000)])
+        area = Point(-0.1, 51.5).buffer(0.05).union(Point(0.1, 51.4).buffer(0.03))
+        index = PointIndex(coords)
+
+        expected = np.flatnonzero(shapely.within(shapely.points(coords), area))
+        np.testing.assert_array_equal(index.query(area), expected)
+        assert len(expected) > 0
+
+    def test_ids_within_returns_ids(self):
+        """Test that ids are returned in place of positions when provided."""
+        coords = np.array([[0.5, 0.5], [2.0, 2.0], [0.1, 0.9]])
+        index = PointIndex(coords, ids=np.array(["A1 1AA", "B2 2BB", "C3 3CC"]))
+        square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+        assert list(index.ids_within(square)) == ["A1 1AA", "C3 3CC"]
+
+    def test_boundary_points_excluded(self):
+        """Test that points on the boundary are not counted as inside."""
+        index = PointIndex(np.array([[0.0, 0.5], [0.5, 0.5]]))
+        square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+        assert list(index.query(square)) == [1]
+
+    def test_empty_area(self):
+        """Test that an empty area returns no points."""
+        index = PointIndex(np.array([[0.5, 0.5]]))
+        assert len(index.query(Polygon())) == 0
@@ -0,0 +1,122 @@
+"""Unit tests for the end-to-end suggest flow."""
+
+import datetime
+
+import numpy as np
+import pytest
+import shapely
+
+from compromeets.data.travel_time_table import TravelTimeTable
+from compromeets.data.venue_index import VenueIndex
+from compromeets.models.domain import Venues
+from compromeets.models.inputs import SuggestRequest
+from compromeets.services.meeting_area_service import MeetingAreaService
+from compromeets.services.place_search_service import PlaceSearchService
+from compromeets.services.postcode_resolver import PostcodeResolver
+from compromeets.services.routing_worker import RoutingWorker
+from compromeets.services.suggest_service import SuggestService
+from compromeets.services.travel_time_service import TravelTimeEstimator, TravelTimeService, distance_matrix_m
+
+MONDAY_8AM = datetime.datetime(2026, 2, 2, 8, 0)
+
+
+class FakeRouter:
+    """Straight-line travel at 20 km/h, recording the transport modes of every call."""
+
+    def __init__(self):
+        self.modes = []
+
+    def __call__(self, origins, destinations, departure, *, transport_modes, max_time_minutes):
+        self.modes.append(transport_modes)
+        return distance_matrix_m(origins, destinations) / (20_000 / 60)
+
+
+@pytest.fixture
+def router():
+    return FakeRouter()
+
+
+@pytest.fixture
+def service(table_dir, router):
+    """A service over the table fixture's outer zones, with postcodes and venues along the line."""
+    resolver = PostcodeResolver(
+        np.array(["W12 7AA", "E3 2AA", "WC1A 1AA", "N1 9AA", "CB2 1TN"]),
+        np.array([[-0.20, 51.5], [-0.06, 51.5], [-0.13, 51.5], [-0.13, 51.55], [0.12, 52.2]]),
+    )
+    venue_index = VenueIndex(
+        Venues(
+            coords=np.array([[-0.131, 51.501], [-0.128, 51.499], [-0.19, 51.5]]),
+            kinds=np.array([0, 2, 0], dtype=np.uint8),  # pub, cafe, pub
+            names=np.array(["The Middle", "Halfway Cafe", "The Near West"]),
+            osm_ids=np.array([1, 2, 3]),
+        )
+    )
+    worker = RoutingWorker(router=router, batch_window_s=0.05).start()
+    estimator = TravelTimeEstimator(TravelTimeTable.load(table_dir), nearest_zones=1)
+    with SuggestService(
+        resolver=resolver,
+        travel_time_service=TravelTimeService(estimator=estimator, routing_worker=worker),
+        routing_worker=worker,
+        meeting_area_service=MeetingAreaService(postcode_index=resolver.index, venue_index=venue_index),
+        place_search_service=PlaceSearchService(venue_index=venue_index),
+    ) as service:
+        yield service
+
+
+class TestSuggestService:
+    """Test suite for SuggestService."""
+
+    def test_suggests_venues_in_the_overlap(self, service, router):
+        """Test the budget from the table, one batched isochrone call, and the overlap's contents."""
+        response = service.suggest(SuggestRequest(postcodes=["W12 7AA", "E3 2AA"], departure=MONDAY_8AM))
+
+        assert response.budget_minutes == 18  # 70% of the table's 25 minutes end to end
+        assert router.modes == [("TRANSIT", "WALK")]  # budget came from the table; isochrones in one call
+        assert response.sample_postcodes == ["WC1A 1AA"]
+        assert [v.name for v in response.venues] == ["The Middle"]
+        assert response.venues[0].travel_minutes == pytest.approx([12.2, 14.2], abs=0.1)  # hops plus a 2 minute walk
+        assert response.center_longitude == pytest.approx(-0.13, abs=0.002)
+        overlap = shapely.geometry.shape(response.overlap)
+        assert overlap.contains(shapely.Point(-0.13, 51.5))
+        assert not overlap.contains(shapely.Point(-0.19, 51.5))
+        assert response.map is None
+
+    def test_non_transit_modes_are_routed_for_the_budget(self, service, router):
+        """Test that a cycling request routes its budget by bike instead of reading the transit table."""
+        request = SuggestRequest(
+            postcodes=["W12 7AA", "E3 2AA"], departure=MONDAY_8AM, transport_modes=["BICYCLE"], venue_kinds=["cafe"]
+        )
+        response = service.suggest(request)
+
+        assert router.modes == [("BICYCLE",)] * 3  # budget, isochrones, then times to the candidates
+        expected = distance_matrix_m(np.array([[-0.20, 51.5]]), np.array([[-0.06, 51.5]]))[0, 0] / (20_000 / 60)
+        assert response.budget_minutes == round(expected * 0.7)
+        assert [v.name for v in response.venues] == ["Halfway Cafe"]
+
+    def test_long_budgets_are_clamped(self, service):
+        """Test that a far-apart group gets the capped budget rather than a region-sized isochrone."""
+        service.max_budget_minutes = 10
+        request = SuggestRequest(postcodes=["W12 7AA", "CB2 1TN"], departure=MONDAY_8AM, transport_modes=["BICYCLE"])
+        response = service.suggest(request)
+
+        assert response.budget_minutes == 10
+        assert response.postcodes_in_overlap == 0
+
+    def test_table_unreachable_pair_is_rejected(self, service):
+        """Test that a pair beyond the table's reach fails instead of budgeting a walk."""
+        with pytest.raises(ValueError, match="No route found"):
+            service.suggest(SuggestRequest(postcodes=["W12 7AA", "CB2 1TN"], departure=MONDAY_8AM))
+
+    def test_zoom_returns_cached_map_instead_of_geojson(self, service):
+        """Test that a zoom gives a TopoJSON map that can be fetched again by request id."""
+        response = service.suggest(SuggestRequest(postcodes=["W12 7AA", "E3 2AA"], departure=MONDAY_8AM, zoom=12))
+
+        assert response.overlap is None
+        assert response.map["type"] == "Topology"
+        assert set(response.map["objects"]) == {"isochrones", "overlap", "postcodes"}
+        assert service.map(response.request_id, 12) is service.map(response.request_id, 12)
+
+    def test_unknown_postcode(self, service):
+        """Test that unknown postcodes are reported before any routing."""
+        with pytest.raises(KeyError, match="Unknown postcode"):
+            service.suggest(SuggestRequest(postcodes=["W12 7AA", "ZZ9 9ZZ"], departure=MONDAY_8AM))
@@ -0,0 +1,149 @@
+"""Unit tests for the compact TopoJSON map output."""
+
+import json
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point, mapping
+
+from compromeets.data.spatial_index import PointIndex
+from compromeets.services.isochrone_service import isochrone_grid, isochrones_from_times
+from compromeets.services.meeting_area_service import MeetingAreaService
+from compromeets.services.topology_encoder import TopologyCache, decode_topology, encode_topology, pixel_size
+from compromeets.services.travel_time_service import distance_matrix_m
+
+ORIGINS = [(-0.13, 51.50), (-0.08, 51.52), (-0.11, 51.47)]
+
+
+@pytest.fixture(scope="module")
+def layers():
+    """Grid-cell isochrones with uneven speeds for three people, and their overlap."""
+    isochrones = []
+    for origin in ORIGINS:
+        grid = isochrone_grid(origin, 30)
+        speed_factor = 1 + 0.25 * np.sin(grid[:, 0] * 60) * np.cos(grid[:, 1] * 90)
+        minutes = distance_matrix_m(np.array([origin]), grid)[0] / (20_000 / 60) * speed_factor
+        isochrones.append(isochrones_from_times(grid, minutes, [30])[0])
+    return {"isochrones": isochrones, "overlap": [shapely.intersection_all(isochrones)]}
+
+
+def referenced_arcs(topology, name):
+    """Indices of the arcs an object's geometries use."""
+    found = set()
+
+    def walk(refs):
+        for ref in refs:
+            if isinstance(ref, list):
+                walk(ref)
+            else:
+                found.add(ref if ref >= 0 else ~ref)
+
+    for geometry in topology["objects"][name]["geometries"]:
+        walk(geometry.get("arcs", []))
+    return found
+
+
+class TestEncodeTopology:
+    """Test suite for encode_topology and decode_topology."""
+
+    def test_round_trip_at_street_zoom(self, layers):
+        """Test that decoded polygons match the originals to within the quantisation."""
+        topology = encode_topology(layers, zoom=16)
+        for original, decoded in zip(layers["isochrones"], decode_topology(topology, "isochrones"), strict=True):
+            assert decoded.is_valid
+            assert abs(decoded.area - original.area) / original.area < 1e-3
+            assert shapely.hausdorff_distance(decoded, original) < max(pixel_size(16, 51.5))
+
+    def test_overlap_reuses_isochrone_arcs(self, layers):
+        """Test that every overlap boundary is stored once and shared with the isochrones."""
+        topology = encode_topology(layers, zoom=12)
+        overlap_arcs = referenced_arcs(topology, "overlap")
+        assert overlap_arcs
+        assert overlap_arcs <= referenced_arcs(topology, "isochrones")
+
+    def test_output_shrinks_with_zoom(self, layers):
+        """Test that lower zooms give smaller output, all far smaller than GeoJSON."""
+        geojson = len(json.dumps([mapping(g) for layer in layers.values() for g in layer]))
+        sizes = [len(json.dumps(encode_topology(layers, zoom))) for zoom in (9, 12, 16)]
+        assert sizes == sorted(sizes)
+        assert sizes[1] * 10 < geojson
+
+    def test_specks_are_dropped_at_low_zoom(self):
+        """Test that a polygon smaller than a few pixels disappears but is kept when zoomed in."""
+        layers = {"areas": [Point(-0.1, 51.5).buffer(0.0003), Point(-0.2, 51.5).buffer(0.05)]}
+        assert decode_topology(encode_topology(layers, zoom=9), "areas")[0].is_empty
+        assert not decode_topology(encode_topology(layers, zoom=16), "areas")[0].is_empty
+
+    def test_points_and_empty_geometries(self):
+        """Test that points survive quantisation and empty geometries become null geometries."""
+        points = shapely.multipoints([[-0.1276, 51.5074], [-0.0235, 51.5050]])
+        topology = encode_topology({"postcodes": [points], "overlap": [shapely.Polygon()]}, zoom=14)
+        assert topology["objects"]["overlap"]["geometries"] == [{"type": None}]
+        decoded = decode_topology(topology, "postcodes")[0]
+        np.testing.assert_allclose(shapely.get_coordinates(decoded), shapely.get_coordinates(points), atol=1e-4)
+
+    def test_rejects_unsupported_geometry_types(self):
+        """Test that lines are refused rather than encoded as their vertices."""
+        collection = shapely.GeometryCollection([shapely.box(0, 0, 1, 1), shapely.LineString([(1, 1), (1, 2)])])
+        with pytest.raises(ValueError, match="Cannot encode GeometryCollection in layer 'overlap'"):
+            encode_topology({"overlap": [collection]}, zoom=12)
+
+
+class TestTopologyCache:
+    """Test suite for TopologyCache."""
+
+    def test_encodes_once_per_zoom(self, layers):
+        """Test that repeated requests for a zoom return the cached topology."""
+        cache = TopologyCache()
+        cache.put("a", layers)
+        first = cache.get("a", 12)
+        assert cache.get("a", 12) is first
+        assert cache.get("a", 14) is not first
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched request is evicted first."""
+        cache = TopologyCache(maxsize=2)
+        layer = {"overlap": [Point(0, 0).buffer(1)]}
+        cache.put("a", layer)
+        cache.put("b", layer)
+        cache.get("a", 5)
+        cache.put("c", layer)
+        assert "a" in cache
+        assert "b" not in cache
+        with pytest.raises(KeyError, match="Unknown request id"):
+            cache.get("b", 5)
+
+    def test_evicts_by_stored_coordinates(self):
+        """Test that large entries are evicted once the coordinate budget is exceeded, keeping the newest."""
+        circle = Point(0, 0).buffer(1)  # 65 coordinates
+        cache = TopologyCache(max_coordinates=150)
+        cache.put("a", {"overlap": [circle]})
+        cache.put("b", {"overlap": [circle]})
+        cache.put("c", {"overlap": [circle]})
+        assert len(cache) == 2
+        assert "a" not in cache
+        cache.put("huge", {"overlap": [Point(0, 0).buffer(1, quad_segs=100)]})
+        assert len(cache) == 1
+        assert "huge" in cache
+
+    def test_rejects_bad_zoom(self):
+        """Test that zooms outside the web map range are rejected."""
+        with pytest.raises(ValueError, match="zoom must be between"):
+            TopologyCache().get("a", 30)
+
+
+class TestMapLayers:
+    """Test suite for MeetingAreaService.map_layers."""
+
+    def test_layers_include_sampled_postcodes(self, layers):
+        """Test that the map has the isochrones, the overlap and at most max_postcodes markers."""
+        overlap = layers["overlap"][0]
+        coords = np.random.default_rng(0).uniform(overlap.bounds[:2], overlap.bounds[2:], (400, 2))
+        service = MeetingAreaService(postcode_index=PointIndex(coords))
+        area = service.find_meeting_area(layers["isochrones"])
+        assert len(area.postcodes) > 50
+
+        map_layers = service.map_layers(area, layers["isochrones"], max_postcodes=50)
+        assert list(map_layers) == ["isochrones", "overlap", "postcodes"]
+        assert shapely.get_num_geometries(map_layers["postcodes"][0]) == 50
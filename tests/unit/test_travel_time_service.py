@@ -0,0 +1,169 @@
+"""Unit tests for the precomputed travel time table and the table-backed estimator."""
+
+import datetime
+import zipfile
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from compromeets.data.travel_time_table import (
+    TravelTimeTable,
+    count_faster_than_walking,
+    slots_for_feeds,
+    snap_to_grid,
+)
+from compromeets.services.routing_worker import RoutingWorker
+from compromeets.services.travel_time_service import TravelTimeEstimator, TravelTimeService, distance_matrix_m
+
+WEEKDAY_8AM = datetime.datetime(2026, 2, 2, 8, 0)
+
+# The zones of the shared table_dir fixture
+ZONES = np.array([[-0.20, 51.5], [-0.13, 51.5], [-0.06, 51.5]])
+
+
+class FakeRouter:
+    """Straight-line travel at 20 km/h, recording the transport modes of every call."""
+
+    def __init__(self, unreachable=()):
+        self.modes = []
+        self.unreachable = unreachable
+
+    def __call__(self, origins, destinations, departure, *, transport_modes, max_time_minutes):
+        self.modes.append(transport_modes)
+        times = distance_matrix_m(origins, destinations) / (20_000 / 60)
+        for i, j in self.unreachable:
+            times[i, j] = np.nan
+        return times
+
+
+def write_gtfs(path, calendar_rows, calendar_dates_rows=()):
+    """Write a GTFS zip holding just the calendar files."""
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(
+            "calendar.txt",
+            "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+            + "".join(f"s{i},1,1,1,1,1,1,1,{start},{end}\n" for i, (start, end) in enumerate(calendar_rows)),
+        )
+        if calendar_dates_rows:
+            z.writestr(
+                "calendar_dates.txt",
+                "service_id,date,exception_type\n" + "".join(f"x,{d},{t}\n" for d, t in calendar_dates_rows),
+            )
+    return path
+
+
+class TestTravelTimeTable:
+    """Test suite for TravelTimeTable."""
+
+    def test_load_memory_maps_times(self, table_dir):
+        """Test that matrices are opened as read-only memory maps."""
+        table = TravelTimeTable.load(table_dir)
+        assert isinstance(table.times["weekday_0800"], np.memmap)
+        assert table.times["weekday_0800"].dtype == np.uint16
+        assert table.times["weekday_0800"][0, 2] == 25
+
+    def test_slot_for_matches_day_type_then_time(self, table_dir):
+        """Test that slot selection prefers the same day type over the closest time."""
+        table = TravelTimeTable.load(table_dir)
+        assert table.slot_for(datetime.datetime(2026, 2, 4, 13, 0)) == "weekday_0800"
+        assert table.slot_for(datetime.datetime(2026, 2, 7, 8, 0)) == "weekend_1200"
+
+    def test_snap_to_grid_merges_nearby_points(self):
+        """Test that points within one cell collapse to their mean."""
+        points = np.array([[-0.1000, 51.5000], [-0.1001, 51.5001], [-0.2, 51.6]])
+        zones = snap_to_grid(points, cell_size_m=250)
+        assert len(zones) == 2
+        assert any(np.allclose(z, [-0.10005, 51.50005]) for z in zones)
+
+    def test_slots_fall_inside_every_feeds_service_window(self, tmp_path):
+        """Test that slot dates are a Tuesday and Saturday a week into the feeds' shared dates."""
+        feeds = [
+            write_gtfs(tmp_path / "bus.zip", [("20260301", "20260630")]),
+            write_gtfs(tmp_path / "tube.zip", [("20260310", "20260331")], [("20260415", "1"), ("20260320", "2")]),
+        ]
+        slots = slots_for_feeds(feeds)
+        assert slots["weekday_0800"] == datetime.datetime(2026, 3, 17, 8, 0)
+        assert slots["weekday_1800"] == datetime.datetime(2026, 3, 17, 18, 0)
+        assert slots["weekend_1200"] == datetime.datetime(2026, 3, 21, 12, 0)
+
+    def test_slot_dates_can_be_overridden(self, tmp_path):
+        """Test that explicit dates are used without reading the feeds."""
+        slots = slots_for_feeds([], weekday=datetime.date(2026, 5, 5), weekend=datetime.date(2026, 5, 9))
+        assert slots["weekend_1200"] == datetime.datetime(2026, 5, 9, 12, 0)
+
+    def test_feeds_without_shared_dates_are_rejected(self, tmp_path):
+        """Test that feeds with disjoint calendars fail rather than routing outside one of them."""
+        feeds = [
+            write_gtfs(tmp_path / "a.zip", [("20260101", "20260131")]),
+            write_gtfs(tmp_path / "b.zip", [("20260301", "20260331")]),
+        ]
+        with pytest.raises(ValueError, match="no service dates in common"):
+            slots_for_feeds(feeds)
+
+    def test_walking_speed_trips_are_not_counted_as_transit(self):
+        """Test that only trips quicker than walking count as routed transit."""
+        origins = np.repeat(ZONES[[0]], 2, axis=0)
+        destinations = np.repeat(ZONES[[2]], 2, axis=0)  # about 9.7 km
+        assert count_faster_than_walking(origins, destinations, np.array([120.0, 150.0])) == 0
+        assert count_faster_than_walking(origins, destinations, np.array([30.0, 150.0])) == 1
+
+
+class TestTravelTimeEstimator:
+    """Test suite for TravelTimeEstimator."""
+
+    def test_estimate_adds_walk_legs_to_table_time(self, table_dir):
+        """Test that an estimate between zone centres equals the table time."""
+        estimator = TravelTimeEstimator(TravelTimeTable.load(table_dir), nearest_zones=1)
+        result = estimator.estimate(ZONES[[0]], ZONES[[2]], WEEKDAY_8AM)
+        assert result.shape == (1, 1)
+        assert result[0, 0] == pytest.approx(25)
+
+    def test_estimate_considers_several_access_zones(self, table_dir):
+        """Test that a point between zones can board at whichever gives the quickest trip."""
+        estimator = TravelTimeEstimator(TravelTimeTable.load(table_dir), nearest_zones=2)
+        origin = np.array([[-0.17, 51.5]])  # ~2 km from zone 0, ~2.4 km from zone 1
+        result = estimator.estimate(origin, ZONES[[2]], WEEKDAY_8AM)
+        walk_to_zone_1 = 0.04 * 111_320 * np.cos(np.radians(51.5)) / 60
+        assert result[0, 0] == pytest.approx(walk_to_zone_1 + 12, rel=0.01)
+
+    def test_unreachable_walks_only_within_the_table_cut_off(self, table_dir):
+        """Test that without a table route the estimate is the direct walk, or inf beyond the cut-off."""
+        estimator = TravelTimeEstimator(TravelTimeTable.load(table_dir))
+        weekend = datetime.datetime(2026, 2, 1, 12, 0)
+        result = estimator.estimate(ZONES[[0]], ZONES[[1, 2]], weekend)
+        assert 60 < result[0, 0] < 120  # about 4.9 km on foot
+        assert result[0, 1] == np.inf  # about 9.7 km, longer than the table's 120 minutes
+        service = TravelTimeService(estimator=estimator)
+        assert service.max_pairwise_travel_time(ZONES, weekend) == np.inf
+
+    def test_max_pairwise(self, table_dir):
+        """Test that the pairwise budget is the slowest pair."""
+        service = TravelTimeService(estimator=TravelTimeEstimator(TravelTimeTable.load(table_dir), nearest_zones=1))
+        assert service.max_pairwise_travel_time(ZONES, WEEKDAY_8AM) == pytest.approx(25)
+
+    def test_service_requires_a_backend(self):
+        """Test that the service needs either a network or an estimator."""
+        with pytest.raises(ValueError, match="must be provided"):
+            TravelTimeService()
+
+
+class TestTravelTimeService:
+    """Test suite for TravelTimeService."""
+
+    def test_non_table_modes_are_routed_not_estimated(self):
+        """Test that the table estimator only answers for the modes it was built with."""
+        router = FakeRouter()
+        estimator = Mock(estimate=Mock(return_value=np.zeros((2, 2))))
+        with RoutingWorker(router=router) as worker:
+            service = TravelTimeService(estimator=estimator, routing_worker=worker)
+            assert service.max_pairwise_travel_time(ZONES[:2], WEEKDAY_8AM, transport_modes=["WALK", "TRANSIT"]) == 0
+            service.max_pairwise_travel_time(ZONES[:2], WEEKDAY_8AM, transport_modes=["BICYCLE"])
+        estimator.estimate.assert_called_once()
+        assert router.modes == [("BICYCLE",)]
+
+    def test_unreachable_routed_pair_makes_budget_infinite(self):
+        """Test that a pair exact routing cannot connect (nan) gives an infinite budget."""
+        with RoutingWorker(router=FakeRouter(unreachable=[(0, 1)])) as worker:
+            service = TravelTimeService(routing_worker=worker)
+            assert service.max_pairwise_travel_time(ZONES[:2], WEEKDAY_8AM, exact=True) == np.inf